@@ -1,5 +1,11 @@
 from __future__ import annotations
-from typing import List, Union, Dict
+from typing import List, Union, Dict, Iterator, Tuple
+from operator import itemgetter, eq
+from itertools import compress, repeat, count
+from dataclasses import dataclass, field
+from collections import defaultdict
+from functools import lru_cache, cached_property
+from sys import intern
 from pathlib import Path
 import csv
 
@@ -12,33 +18,64 @@ It allows for rapid high-level coordination between data sources by calling meth
 That said, because this caches a LOT of data in memory, the initialization can take quite some time.
 """
 
+# Columns read from student_export.csv, in the order Student() takes them as arguments.
+STUDENT_CSV_COLUMNS = ('StudentID', 'FirstName', 'MiddleName', 'LastName',
+                       'Grade', 'SchoolID', 'Enrolled', 'DistrictRelationship')
+# Values of the Enrolled column that mean a student is enrolled. Anything else, including "0", "N" and blank, is not.
+ENROLLED_VALUES = frozenset({'true', '1', 'yes', 'y', 'enrolled'})
+# Ordinal suffix by last digit, with 4-9 all sharing the final 'th'.
+ORDINAL_SUFFIXES = ('th', 'st', 'nd', 'rd', 'th')
+# Every grade name a student csv normally contains, lowercased, mapped to what Grade.make_ordinal returns for it.
+GRADE_ORDINALS = {
+    'pk': 'Preschool', '-1': 'Preschool',
+    'k': 'Kindergarten', '0': 'Kindergarten',
+    '1': '1stGrade', '2': '2ndGrade', '3': '3rdGrade', '4': '4thGrade', '5': '5thGrade', '6': '6thGrade',
+    '7': '7thGrade', '8': '8thGrade', '9': '9thGrade', '10': '10thGrade', '11': '11thGrade', '12': '12thGrade',
+}
+
 
 class District:
 
     def __init__(self):
         self.name = 'School District'  # TODO: Load from conf
-        self.student_csv = self.load_student_csv()
         self.ldap = LdapDirectory()
         self.google_service = GoogleService()
         self.schools: List[School] = self.get_all_schools()
-        self.students: List[Student] = self.get_all_students()
+        self.students_table: Dict[str, List] = self.load_students_table()
         self.staff: List[Staff] = self.get_all_staff()
 
-    def load_student_csv(self, csv_file_path: Path = Path('student_export.csv')) -> List[Dict]:
+    def load_student_csv(self, csv_file_path: Path = Path('student_export.csv')) -> Iterator[Tuple]:
         """
-        Reads the student information csv specified in configuration file into memory.
+        Streams the student information csv specified in configuration file one row at a time.
         It expects to find a file called student_export.csv that contains the following columns:
-        "StudentID","FirstName","MiddleName","LastName","Grade","SchoolID","Enrolled","District Relationship"
+        "StudentID","FirstName","MiddleName","LastName","Grade","SchoolID","Enrolled","DistrictRelationship"
+        Other columns are ignored, and any of these that are missing are read as None.
         Students not included in the student_export csv are will have their accounts disabled.
         Disabled users have their groups removed to keep group membership clean.
-        Returns:
-            A dictionary of key:value pairs from the student information csv file.
+        Yields:
+            A tuple per row of the student information csv file, ordered as STUDENT_CSV_COLUMNS.
         """
         # TODO: build ingest/transfer mechanism for CSV
-        with open(csv_file_path, 'r', newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            student_csv_values = [row for row in reader]
-        return student_csv_values
+        with open(csv_file_path, 'r', newline='', buffering=1 << 20) as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader, [])
+            if header:
+                # Spreadsheet exports often start with a byte order mark, which would otherwise end up in the first
+                # header name and hide the StudentID column.
+                header[0] = header[0].lstrip('\ufeff')
+            width = len(header)
+            # Missing columns point at index -1, which is the None padded onto the end of every row.
+            select = itemgetter(*[header.index(column) if column in header else -1
+                                  for column in STUDENT_CSV_COLUMNS])
+            for row in reader:
+                if not row:
+                    # Blank lines are skipped, as csv.DictReader does.
+                    continue
+                if len(row) < width:
+                    # Short rows have their missing trailing columns read as None.
+                    row.extend([None] * (width - len(row)))
+                row.append(None)
+                yield select(row)
 
     def get_all_schools(self) -> List[School]:
         """
@@ -49,14 +86,103 @@ class District:
         """
         return []
 
-    def get_all_students(self) -> List[Student]:
+    def get_all_students(self) -> Iterator[Student]:
         """
         Queries the configured source of truth for what students should exist,
         as well as current created accounts, and loads data about all students known both past and present.
+        Yields:
+            A Student for every row of self.students_table, built as it is requested.
+        """
+        for values in zip(*self.students_table.values()):
+            yield Student(*values)
+
+    @cached_property
+    def students(self) -> List[Student]:
+        """
+        Every student as a Student instance. Built from self.students_table the first time it is used, so syncs that
+        only need a school or grade can use students_for or view_of_grade and never pay for the whole district.
+        """
+        return list(self.get_all_students())
+
+    def load_students_table(self) -> Dict[str, List]:
+        """
+        Reads the student information csv into a column-oriented table, one list per Student field, so that bulk
+        filters only need to walk the single column they compare against and no Student objects are built up front.
         Returns:
-            A list of all students with objects for any existing accounts, as well as status information.
+            A dictionary of Student field name to a list of that field's value for every student, in csv order.
         """
-        return []
+        columns = tuple([] for _ in Student.__match_args__)
+        appends = [column.append for column in columns]
+        for row in self.load_student_csv():
+            for append, value in zip(appends, Student.parse_csv_row(row)):
+                append(value)
+        # __match_args__ is generated by dataclass and lists the fields in the same order as parse_csv_row.
+        return dict(zip(Student.__match_args__, columns))
+
+    def reload_students(self) -> None:
+        """
+        Re-reads the student information csv into self.students_table. If self.students has already been built,
+        students that were already loaded keep their existing Student object, updated in place, so a resync only
+        allocates objects for new students and any references held elsewhere stay current.
+        Returns:
+            None. Updates self.
+        """
+        self.students_table = self.load_students_table()
+        if 'students' not in self.__dict__:
+            return
+        existing = {student.student_id: student for student in self.students}
+        students = []
+        for values in zip(*self.students_table.values()):
+            student = existing.get(values[0])
+            if student is None:
+                student = Student(*values)
+            else:
+                student.update(values)
+            students.append(student)
+        self.students = students
+
+    def students_where(self, column: str, value) -> Iterator[Student]:
+        """
+        Gets every student whose field matches a value by scanning only that column of self.students_table.
+        Args:
+            column: Student field name, e.g. "grade" or "school_id".
+            value: Value the field must equal.
+
+        Yields:
+            Matching Student instances. These are the objects in self.students if it has been built, otherwise they
+            are built as they are requested.
+        """
+        matches = compress(count(), map(eq, self.students_table[column], repeat(value)))
+        if 'students' in self.__dict__:
+            students = self.students
+            for i in matches:
+                yield students[i]
+        else:
+            columns = list(self.students_table.values())
+            for i in matches:
+                yield Student(*[column[i] for column in columns])
+
+    def students_for(self, school_id: str) -> Iterator[Student]:
+        """
+        Gets every student in a school.
+        Args:
+            school_id: SchoolID as it appears in the student information csv.
+
+        Yields:
+            Student instances in that school.
+        """
+        return self.students_where('school_id', school_id)
+
+    def view_of_grade(self, grade_name: str) -> List[Student]:
+        """
+        Gets every student in a grade by scanning only the grade column of self.students_table.
+        Args:
+            grade_name: Grade as it appears in the student information csv, e.g. "K" or "3".
+
+        Returns:
+            A list of Student instances in that grade.
+        """
+        return list(self.students_where('grade', grade_name))
 
     def get_all_staff(self) -> List[Staff]:
         """
@@ -68,36 +194,56 @@ class District:
         return []
 
 
+@dataclass(slots=True)
 class School:
+    students: List[LdapUser] = field(default_factory=list, repr=False)
+    allStaff: List[LdapUser] = field(default_factory=list, repr=False)
+    students_by_department: Dict[str, List[LdapUser]] = field(init=False, repr=False)
+    staff_by_department: Dict[str, List[LdapUser]] = field(init=False, repr=False)
 
-    def __init__(self):
-        pass
+    def __post_init__(self):
+        self.students_by_department = School.index_by_department(self.students)
+        self.staff_by_department = School.index_by_department(self.allStaff)
+
+    @staticmethod
+    def index_by_department(users: List[LdapUser]) -> Dict[str, List[LdapUser]]:
+        """
+        Groups users by their department so a Grade can find its members with a single lookup.
+        Args:
+            users: LdapUsers to index.
+
+        Returns:
+            A dictionary of department to the users in that department.
+        """
+        index = defaultdict(list)
+        for user in users:
+            index[user.department].append(user)
+        return index
 
 
+@dataclass(slots=True)
 class Grade:
+    school: School = field(repr=False)
+    name: str
+    ordinal: str = field(init=False)
+    students: List[LdapUser] = field(init=False, repr=False)
+    teachers: List[LdapUser] = field(init=False, repr=False)
 
-    def __init__(self, school, name):
-        self.school = school
-        self.name = name
+    def __post_init__(self):
         self.ordinal = Grade.make_ordinal(self.name)
-        self.students: List[LdapUser] = self.get_all_students()
-        self.teachers: List[LdapUser] = self.get_all_teachers()
+        self.students = self.get_all_students()
+        self.teachers = self.get_all_teachers()
 
     def get_all_students(self):
-        students = []
-        for user in self.school.students:
-            if user.department == self.name:  # TODO: allow different source of truth for grade
-                students.append(user)
-        return students
+        # TODO: allow different source of truth for grade
+        return self.school.students_by_department.get(self.name, [])
 
     def get_all_teachers(self):
-        teachers = []
-        for user in self.school.allStaff:
-            if user.department == self.name:  # TODO: allow different source of truth for grade
-                teachers.append(user)
-        return teachers
+        # TODO: allow different source of truth for grade
+        return self.school.staff_by_department.get(self.name, [])
 
     @staticmethod
+    @lru_cache(maxsize=64)
     def make_ordinal(n):
         """
         Convert an integer into its ordinal representation::
@@ -106,6 +252,19 @@ class Grade:
             make_ordinal(3)   => '3rd'
             make_ordinal(122) => '122nd'
             make_ordinal(213) => '213th'
+
+        Grade names from the csv are looked up in GRADE_ORDINALS, anything else falls back to compute_ordinal.
+        """
+        if isinstance(n, str):
+            ordinal = GRADE_ORDINALS.get(n.lower())
+            if ordinal is not None:
+                return ordinal
+        return Grade.compute_ordinal(n)
+
+    @staticmethod
+    def compute_ordinal(n):
+        """
+        Slow path of make_ordinal for values that are not in GRADE_ORDINALS.
         """
         if n == '0':
             return "Kindergarten"
@@ -118,7 +277,7 @@ class Grade:
                 return "Kindergarten"
             elif n.lower() == 'pk':
                 return "Preschool"
-        suffix = ['th', 'st', 'nd', 'rd', 'th'][min(n % 10, 4)]
+        suffix = ORDINAL_SUFFIXES[min(n % 10, 4)]
         if 11 <= (n % 100) <= 13:
             suffix = 'th'
         if n > 0:
@@ -127,21 +286,64 @@ class Grade:
             return str(n) + suffix
 
 
+@dataclass(slots=True)
 class Student:
-    def __init__(self, student_csv_dict):
-        self.student_id = student_csv_dict.get('StudentID')
-        self.first_name = student_csv_dict.get('FirstName')
-        self.middle_name = student_csv_dict.get('MiddleName')
-        self.last_name = student_csv_dict.get("LastName")
-        self.grade = student_csv_dict.get('Grade')
-        self.school_id = student_csv_dict.get('SchoolID')
-        self.enrolled: bool = True if student_csv_dict.get('Enrolled') else False
-        # District Relationship is a set of status codes used by some districts, such as those in OHIO, to indicate
-        # which students are a physical butt in a seat in their classrooms, versus students that live in one district
-        # but attend school somewhere else.
-        self.district_relationship = student_csv_dict.get('DistrictRelationship')
+    student_id: str
+    first_name: str
+    middle_name: str
+    last_name: str
+    grade: str
+    school_id: str
+    enrolled: bool
+    # District Relationship is a set of status codes used by some districts, such as those in OHIO, to indicate
+    # which students are a physical butt in a seat in their classrooms, versus students that live in one district
+    # but attend school somewhere else.
+    district_relationship: str
 
-class Staff:
+    @classmethod
+    def from_csv_row(cls, row: Tuple) -> Student:
+        """
+        Builds a Student from a single row yielded by District.load_student_csv.
+        Args:
+            row: Tuple of values ordered as STUDENT_CSV_COLUMNS.
 
-    def __init__(self):
-        pass
+        Returns:
+            A Student instance.
+        """
+        return cls(*Student.parse_csv_row(row))
+
+    def update(self, values: Tuple) -> None:
+        """
+        Overwrites this Student in place.
+        Args:
+            values: Tuple of values ordered as Student's fields, as returned by parse_csv_row.
+
+        Returns:
+            None. Updates self.
+        """
+        for name, value in zip(self.__match_args__, values):
+            setattr(self, name, value)
+
+    @staticmethod
+    def parse_csv_row(row: Tuple) -> Tuple:
+        """
+        Converts a raw csv row into Student field values.
+        Args:
+            row: Tuple of values ordered as STUDENT_CSV_COLUMNS.
+
+        Returns:
+            Tuple of values ordered as Student's fields.
+        """
+        student_id, first_name, middle_name, last_name, grade, school_id, enrolled, district_relationship = row
+        # Grades, schools and relationship codes only have a few dozen distinct values across the whole district, so
+        # intern them to share one string object per value instead of one per student.
+        return (student_id, first_name, middle_name, last_name,
+                intern(grade) if grade is not None else None,
+                intern(school_id) if school_id is not None else None,
+                enrolled is not None and enrolled.strip().lower() in ENROLLED_VALUES,
+                intern(district_relationship) if district_relationship is not None else None)
+
+
+@dataclass(slots=True)
+class Staff:
+    pass
@@ -1,5 +1,14 @@
 from __future__ import annotations
-from typing import Dict, List, Union
+from typing import Dict, List, Set
+from functools import cached_property
+
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+
+
+def _normalize_setting(value) -> str:
+    """The Groups Settings API returns every value as a string, e.g. "true", so settings are compared lowercased."""
+    return str(value).lower()
 
 
 class GoogleGroup():
@@ -44,6 +53,12 @@ class GoogleGroup():
         'includeInGlobalAddressList': False,
         'whoCanPostMessage': 'ALL_OWNERS_CAN_POST'
     }
+    _normalized_internal_distribution_list_settings = {k: _normalize_setting(v) for k, v in
+                                                       internal_distribution_list_settings.items()}
+    _normalized_public_distribution_list_settings = {k: _normalize_setting(v) for k, v in
+                                                     public_distribution_list_settings.items()}
+    _normalized_security_group_settings = {k: _normalize_setting(v) for k, v in security_group_settings.items()}
+    batch_size = 1000  #: Most sub-requests Google accepts in a single batch request.
 
     def __init__(self, service, settings_service, group: Dict):
         self.kind: str = group['kind']  #: This should always be admin#directory#group.
@@ -51,49 +66,59 @@ class GoogleGroup():
         self.etag = group['etag']  #:
         self.email: str = group['email']  #: Email Address for this group. Important for syncing with LDAP.
         self.name: str = group['name']  #: Name of the group.
-        self.directMembersCount: int = group[
-            'directMembersCount']  #: How many users are in the group. Doesn't count nested.
-        self.description: str = group['description']  #: Details about what the group's purpose is.
-        self.adminCreated: bool = group['adminCreated']  #: True if made by admin. False if user-created.
-        self.nonEditableAliases: Union[List[str], None] = group.get(
-            ['nonEditableAliases'])  #: Other emails that will reach the group.
+        # The groups().insert response can leave out directMembersCount, adminCreated, and an empty description.
+        self.directMembersCount: int = group.get(
+            'directMembersCount', 0)  #: How many users are in the group. Doesn't count nested.
+        self.description: str = group.get('description', '')  #: Details about what the group's purpose is.
+        self.adminCreated: bool = group.get(
+            'adminCreated')  #: True if made by admin. False if user-created. None if Google didn't say.
+        self.nonEditableAliases: List[str] = group.get(
+            'nonEditableAliases', [])  #: Other emails that will reach the group.
         # end google used properties
         # begin internal used properties
         self.service = service
         self.settings_service = settings_service
-        self.members: List[str] = self.get_members()  #: Email Addresses of direct members of the group.
-        self.json: Dict = self.jsonify()  #: Google API friendly representation of the data.
-        self.settings = settings_service.groups().get(groupUniqueId=self.email).execute()
+        self._clean_json: Dict = self.jsonify()  # Snapshot of the group as loaded, used by patch() to find changes.
+
+    @cached_property
+    def members(self) -> List[str]:
+        """Email Addresses of direct members of the group. Fetched from Google on first access."""
+        return self.get_members()
+
+    @cached_property
+    def _members_set(self) -> Set[str]:
+        """Set of self.members for constant time membership checks. Kept in step by the member methods."""
+        return set(self.members)
+
+    @property
+    def json(self) -> Dict:
+        """Google API friendly representation of the data. Built on every access so it is never stale."""
+        return self.jsonify()
+
+    @cached_property
+    def settings(self) -> Dict:
+        """The group's Groups Settings API resource. Fetched from Google on first access."""
+        return self.settings_service.groups().get(groupUniqueId=self.email).execute()
 
     def get_members(self) -> List[str]:
         """
-        Used to obtain a list of all members in the group.
+        Used to obtain a list of all members in the group. Pages are requested at the API maximum of 200 members.
 
         Returns:
             A list of all members in the group.
         """
         out_list = []
-        nextPageToken = 'dummy'
-        while nextPageToken != '':
-            if nextPageToken == 'dummy':
-                results = self.service.members().list(groupKey=self.id).execute()
-            else:
-                results = self.service.members().list(groupKey=self.id, pageToken=nextPageToken).execute()
-            try:
-                nextPageToken = results['nextPageToken']
-            except KeyError:
-                nextPageToken = ''
-            try:
-                results = results['members']
-            except KeyError:
-                return []
-            for user in results:
-                out_list.append(user['email'])
+        members = self.service.members()
+        request = members.list(groupKey=self.id, maxResults=200)
+        while request is not None:
+            results = request.execute()
+            out_list.extend(user['email'] for user in results.get('members', []))
+            request = members.list_next(request, results)
         return out_list
 
     def add_member(self, email: str) -> None:
         """
-        Used to add a single member to the group.
+        Used to add a single member to the group. Use add_members when adding more than one.
 
         Args:
             email: Email of the user you want to add to this group.
@@ -101,17 +126,36 @@ class GoogleGroup():
         Returns:
             None
         """
+        failures = self.add_members([email])
+        if failures:
+            raise failures[email]
+
+    def add_members(self, emails: List[str]) -> Dict[str, Exception]:
+        """
+        Used to add many members to the group using batched API requests, so each batch of up to
+        GoogleGroup.batch_size members costs a single round-trip.
+
+        Args:
+            emails: Emails of the users you want to add to this group.
+
+        Returns:
+            Dict of email to the error Google returned for every member that could not be added. Empty if all succeeded.
+        """
         # TODO: Parameterize role
-        body = {
-            "email": email,
-            "role": "MEMBER",
-        }
-        self.service.members().insert(groupKey=self.id, body=body).execute()
-        self.members = self.get_members()
+        requests = {email: self.service.members().insert(groupKey=self.id, body={"email": email, "role": "MEMBER"})
+                    for email in emails}
+        failures = self.execute_batch(requests)
+        # Only keep self.members in step if it has been fetched; otherwise the next access fetches it fresh anyway.
+        if 'members' in self.__dict__:
+            for email in requests:
+                if email not in failures and email not in self._members_set:
+                    self.members.append(email)
+                    self._members_set.add(email)
+        return failures
 
     def delete_member(self, email: str) -> None:
         """
-        Used to add a single member to the group.
+        Used to remove a single member from the group. Use delete_members when removing more than one.
 
         Args:
             email: Email of the user you want to remove from this group.
@@ -119,20 +163,94 @@ class GoogleGroup():
         Returns:
             None
         """
-        self.service.members().delete(groupKey=self.id, memberKey=email).execute()
+        failures = self.delete_members([email])
+        if failures:
+            raise failures[email]
+
+    def delete_members(self, emails: List[str]) -> Dict[str, Exception]:
+        """
+        Used to remove many members from the group using batched API requests, so each batch of up to
+        GoogleGroup.batch_size members costs a single round-trip.
+
+        Args:
+            emails: Emails of the users you want to remove from this group.
+
+        Returns:
+            Dict of email to the error Google returned for every member that could not be removed. Empty if all
+            succeeded.
+        """
+        requests = {email: self.service.members().delete(groupKey=self.id, memberKey=email) for email in emails}
+        failures = self.execute_batch(requests)
+        # Only keep self.members in step if it has been fetched; otherwise the next access fetches it fresh anyway.
+        if 'members' in self.__dict__:
+            removed = {email for email in requests if email not in failures}
+            self.members = [member for member in self.members if member not in removed]
+            self._members_set -= removed
+        return failures
+
+    def execute_batch(self, requests: Dict[str, HttpRequest]) -> Dict[str, Exception]:
+        """
+        Helper method that sends API requests through Google's batch endpoint, GoogleGroup.batch_size at a time.
+
+        Args:
+            requests: Dict of a unique id (such as an email) to the un-executed API request.
+
+        Returns:
+            Dict of id to the error raised for every request that failed.
+        """
+        failures = {}
+
+        def callback(request_id, response, exception):
+            if exception is not None:
+                failures[request_id] = exception
+
+        request_items = list(requests.items())
+        for start in range(0, len(request_items), GoogleGroup.batch_size):
+            batch = self.service.new_batch_http_request(callback=callback)
+            for request_id, request in request_items[start:start + GoogleGroup.batch_size]:
+                batch.add(request, request_id=request_id)
+            batch.execute()
+        return failures
+
+    def refresh_members(self) -> List[str]:
+        """
+        Re-reads the group's membership from Google. add_member and delete_member only update self.members locally,
+        so use this when the group may have been changed by something else.
+
+        Returns:
+            A list of all members in the group.
+        """
         self.members = self.get_members()
+        self._members_set = set(self.members)
+        return self.members
 
-    def has_member(self, email: str) -> bool:
+    def has_member(self, email: str, include_indirect: bool = False) -> bool:
         """
-        Used to check if a single member is within the group. Makes an API call, so should only be used for checking
-        a single user or performance will suffer. If checking bulk users then use something like if user in self.members
+        Used to check if a single member is within the group. If self.members has already been fetched, direct members
+        are checked against it. Otherwise a single API call answers the question instead of fetching the whole
+        membership. With include_indirect, a direct miss falls back to an API call that also resolves nested groups.
 
         Args:
             email: User you want to know if is in the group.
+            include_indirect: Also ask Google whether the user is a member through a nested group.
 
         Returns:
             Whether or not the user is in this group.
         """
+        if 'members' in self.__dict__:
+            if email in self._members_set:
+                return True
+            if not include_indirect:
+                return False
+        elif not include_indirect:
+            # members().get only finds direct members, unlike hasMember, which also follows nested groups.
+            try:
+                self.service.members().get(groupKey=self.id, memberKey=email).execute()
+            except HttpError as e:
+                if e.resp.status == 404:
+                    return False
+                raise
+            return True
         r = self.service.members().hasMember(groupKey=self.id, memberKey=email).execute()
         return r['isMember']
 
@@ -165,7 +283,7 @@ class GoogleGroup():
             Properly formatting Dict object that conforms to Directory API v1 specifications.
         """
         return {  # JSON template for Group resource in Directory API.
-            "nonEditableAliases": [self.nonEditableAliases],  # List of non editable aliases (Read-only)
+            "nonEditableAliases": self.nonEditableAliases,  # List of non editable aliases (Read-only)
             "kind": "admin#directory#ldap",  # Kind of resource this is.
             "description": self.description,  # Description of the ldap
             "name": self.name,  # Group name
@@ -206,16 +324,11 @@ class GoogleGroup():
         :return: True if patched
         """
         # TODO: Merge with change to DL and add param for what type of perms to use
-        patch_needed = False
-        for k, v in GoogleGroup.security_group_settings.items():
-            if self.settings[k] != v and type(v) != bool or self.settings[k].lower() != str(
-                    v).lower():  # second is for BOOL values
-                print(f'Changing {self.settings[k]} to {v}')
-                patch_needed = True
-            self.settings[k] = v
-        if patch_needed:
-            self.settings_service.groups().patch(groupUniqueId=self.email, body=self.settings).execute()
-        return patch_needed
+        diff = self.settings_diff(GoogleGroup.security_group_settings,
+                                  GoogleGroup._normalized_security_group_settings)
+        for k, v in diff.items():
+            print(f'Changing {k} from {self.settings.get(k)} to {v}')
+        return self.patch_settings(diff)
 
     def change_to_distribution_list(self, allowPublic: bool = False) -> bool:
         """
@@ -223,35 +336,46 @@ class GoogleGroup():
         :param allowPublic: If true, allow public contact. If false, allow only internal email.
         :return: True if patched
         """
-        patch_needed = False
         if allowPublic:
-            settings = GoogleGroup.public_distribution_list_settings
+            diff = self.settings_diff(GoogleGroup.public_distribution_list_settings,
+                                      GoogleGroup._normalized_public_distribution_list_settings)
         else:
-            settings = GoogleGroup.internal_distribution_list_settings
-        for k, v in settings.items():
-            if self.settings[k] != v and type(v) != bool or self.settings[k].lower() != str(
-                    v).lower():  # second is for BOOL values
-                self.settings[k] = v
-                patch_needed = True
-        if patch_needed:
-            self.settings_service.groups().patch(groupUniqueId=self.email, body=self.settings).execute()
-        return patch_needed
+            diff = self.settings_diff(GoogleGroup.internal_distribution_list_settings,
+                                      GoogleGroup._normalized_internal_distribution_list_settings)
+        return self.patch_settings(diff)
+
+    def settings_diff(self, template: Dict, normalized_template: Dict) -> Dict:
+        """
+        Finds the settings in a template that differ from this group's current settings.
+        :param template: One of the class settings templates, e.g. GoogleGroup.security_group_settings
+        :param normalized_template: The same template with every value passed through _normalize_setting
+        :return: The template entries that need to be changed
+        """
+        return {k: v for k, v in template.items()
+                if _normalize_setting(self.settings.get(k)) != normalized_template[k]}
+
+    def patch_settings(self, diff: Dict) -> bool:
+        """
+        Sends only the changed settings to Google and updates self.settings to reflect them.
+        :param diff: key value pairs of settings to change
+        :return: True if patched
+        """
+        if diff:
+            self.settings_service.groups().patch(groupUniqueId=self.email, body=diff).execute()
+            self.settings.update(diff)
+        return bool(diff)
 
     def patch(self) -> bool:
         """
-        Updates group description
-        :param update_dict: key value pairs you want to update
+        Pushes any fields changed since the group was loaded (or last patched) to Google. Only the changed fields
+        are sent, and the comparison is made against the snapshot taken at load time rather than a fresh fetch.
         :return: True if patched
         """
-        patch_needed = False
-        temp_json = GoogleGroup.get_from_gsuite(self.service, self.settings_service, self.email).jsonify()
-        update_dict = self.jsonify()
-        for k, v in update_dict.items():
-            if temp_json[k] != v:
-                patch_needed = True
-        if patch_needed:
-            result = self.service.groups().patch(groupKey=self.email, body=update_dict).execute()
-        return patch_needed
+        update_dict = {k: v for k, v in self.jsonify().items() if self._clean_json.get(k) != v}
+        if update_dict:
+            self.service.groups().patch(groupKey=self.id, body=update_dict).execute()
+            self._clean_json.update(update_dict)
+        return bool(update_dict)
 
     @staticmethod
     def get_from_gsuite(service, settings_service, id: str) -> GoogleGroup:
@@ -289,5 +413,5 @@ class GoogleGroup():
             "name": name,
             "description": description,
         }
-        service.groups().insert(body=body).execute()
-        return GoogleGroup.get_from_gsuite(service, settings_service, email)
+        result = service.groups().insert(body=body).execute()
+        return GoogleGroup(service=service, settings_service=settings_service, group=result)
@@ -1,9 +1,11 @@
-import pickle
 from pathlib import Path
 from googleapiclient.discovery import build, Resource
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-from typing import List
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+import httplib2
+from typing import Dict, List, Tuple
 
 
 class GoogleService:
@@ -17,7 +19,7 @@ class GoogleService:
         Implement additional scopes for logging
     """
 
-    # If modifying these scopes, delete the file token.pickle.
+    # If modifying these scopes, delete the file token.json.
     # TODO: Move scopes to environment variable
     # TODO: Redo auth to be service account based and generate credentials using superuser at first run
     DIRECTORY_SCOPES: List[str]= ['https://www.googleapis.com/auth/admin.directory.user',
@@ -35,8 +37,15 @@ class GoogleService:
                                   'https://www.googleapis.com/auth/classroom.student-submissions.students.readonly']
     LICENSING_SCOPES: List[str] = ['https://www.googleapis.com/auth/apps.licensing']
     SPREADSHEETS_SCOPES: List[str] = ['https://www.googleapis.com/auth/spreadsheets']
+    ALL_SCOPES: List[str] = sorted(set().union(DIRECTORY_SCOPES, GROUP_SETTINGS_SCOPES, DRIVE_SCOPES, REPORTS_SCOPES,
+                                               CLASSROOM_SCOPES, LICENSING_SCOPES,
+                                               SPREADSHEETS_SCOPES))  #: Requested once so one token covers every API
     # TODO: Refactor creds to environment variables.
     creds_dir = Path(Path(__file__).parents[2], 'creds')
+    _shared_creds: Credentials = None  #: Loaded once by get_credentials and reused by every service.
+    _service_cache: Dict[Tuple[str, str], Resource] = {}  #: Services already built by get_service.
+    _shared_http: AuthorizedHttp = None  #: Connection made once by get_http and used by every service.
+    http_timeout: int = 30  #: Seconds before a request to Google is given up on.
 
     def __init__(self):
         print("Establishing connection to GSuite.")
@@ -49,44 +58,82 @@ class GoogleService:
     # TODO: refactor services into get_service
 
     @staticmethod
-    def get_service(api_name: str, api_version: str, api_scopes: List[str]) -> Resource:
+    def get_credentials() -> Credentials:
         """
-        Helper method that will generate an API Resource Object for an arbitrary Google API.
-        Args:
-            api_name: String of which API we should communicate with
-            api_version: String of the API version, which may be in the format v1, or in the format directory_v1.
-                     The format depends on the API and if that API has different versioning per category.
-            api_scopes: A list of strings containing the Scopes of access we are granting this Resource Object.
+        Helper method that loads the credentials shared by every Google API this process talks to. The token file is
+        read, and if needed refreshed or re-authorized, only the first time; later calls reuse the same object.
 
         Returns:
-            Google API Resource Object that allows API calls to be made against the specified API.
+            Credentials authorized for every scope in ALL_SCOPES.
 
         Creates:
-            An access token authorizing the request is saved to the filesystem if not already present.
+            An access token authorizing every scope in ALL_SCOPES is saved to the filesystem if not already present.
             # TODO: Lockdown token filesystem permissions to the script user automatically.
         """
-        creds = None
-        token_filepath = Path(GoogleService.creds_dir, f'{api_name}_{api_version}_token.pickle')
+        creds = GoogleService._shared_creds
+        token_filepath = Path(GoogleService.creds_dir, 'token.json')
         creds_filepath = Path(GoogleService.creds_dir, 'credentials.json')
-        # The file token.pickle stores the user's access and refresh tokens, and is
+        # The file token.json stores the user's access and refresh tokens for all APIs, and is
         # created automatically when the authorization flow completes for the first
         # time.
-        if Path.exists(token_filepath):
-            with open(token_filepath, 'rb') as token:
-                creds = pickle.load(token)
+        if creds is None and Path.exists(token_filepath):
+            creds = Credentials.from_authorized_user_file(str(token_filepath))
+            # A token saved before a scope was added can't be used for that scope, so authorize again.
+            if not creds.has_scopes(GoogleService.ALL_SCOPES):
+                creds = None
         # If there are no (valid) credentials available, let the user log in.
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
                 creds.refresh(Request())
             else:
                 flow = InstalledAppFlow.from_client_secrets_file(
-                    creds_filepath, api_scopes)
+                    creds_filepath, GoogleService.ALL_SCOPES)
                 creds = flow.run_local_server(port=0)
             # Save the credentials for the next run
-            with open(token_filepath, 'wb') as token:
-                pickle.dump(creds, token)
+            with open(token_filepath, 'w') as token:
+                token.write(creds.to_json())
+        GoogleService._shared_creds = creds
+        return creds
+
+    @staticmethod
+    def get_http() -> AuthorizedHttp:
+        """
+        Helper method that creates the http connection shared by every service get_service builds. httplib2 keeps
+        connections open per host, so services talking to the same Google host reuse one TLS connection.
+        Not thread-safe; threads making their own requests should use their own AuthorizedHttp.
+
+        Returns:
+            An AuthorizedHttp that signs requests with get_credentials() and refreshes them when they expire.
+        """
+        if GoogleService._shared_http is None:
+            GoogleService._shared_http = AuthorizedHttp(GoogleService.get_credentials(),
+                                                        http=httplib2.Http(timeout=GoogleService.http_timeout))
+        return GoogleService._shared_http
+
+    @staticmethod
+    def get_service(api_name: str, api_version: str, api_scopes: List[str]) -> Resource:
+        """
+        Helper method that will generate an API Resource Object for an arbitrary Google API.
+        Args:
+            api_name: String of which API we should communicate with
+            api_version: String of the API version, which may be in the format v1, or in the format directory_v1.
+                     The format depends on the API and if that API has different versioning per category.
+            api_scopes: A list of strings containing the Scopes of access we are granting this Resource Object.
+                     Must be included in ALL_SCOPES.
 
-        service = build(api_name, api_version, credentials=creds)
+        Returns:
+            Google API Resource Object that allows API calls to be made against the specified API. Built once per
+            api_name and api_version and reused by later calls. Every service shares the connection from get_http.
+        """
+        creds = GoogleService.get_credentials()
+        if not creds.has_scopes(api_scopes):
+            raise ValueError(f'{api_name} {api_version} needs scopes that are not in GoogleService.ALL_SCOPES')
+        service = GoogleService._service_cache.get((api_name, api_version))
+        if service is None:
+            # static_discovery uses the discovery documents bundled with googleapiclient instead of downloading them.
+            service = build(api_name, api_version, http=GoogleService.get_http(), cache_discovery=False,
+                            static_discovery=True)
+            GoogleService._service_cache[(api_name, api_version)] = service
         return service
 
 
@@ -1,95 +1,111 @@
 from __future__ import annotations
-from typing import Dict, List
+from typing import Dict, Iterator, List, Tuple
 
 from googleapiclient.errors import HttpError
+from google_auth_httplib2 import AuthorizedHttp
 from apolloveritas.google.group import GoogleGroup
 from apolloveritas.google.service import GoogleService
-from apolloveritas.utils.utils import str_missing_key
 from pathlib import Path
+from functools import cache, cached_property, lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import httplib2
 import json
+import time
 
 
 class GoogleUser:
-    service_instance = GoogleService()
-    service = service_instance.directory_service
-    licensing_service = service_instance.licensing_service
     # TODO: Refactor conf contents to not manually editing a textfile
     defaults_filepath = Path(Path(__file__).parents[2], 'conf', 'google_user_defaults.json')
-    with open(defaults_filepath, 'r') as defaults_file:
-        defaults = json.load(defaults_file)
+
+    _FIELDS = ('addresses', 'posixAccounts', 'phones', 'locations', 'isDelegatedAdmin', 'recoveryPhone', 'suspended',
+               'keywords', 'id', 'aliases', 'nonEditableAliases', 'archived', 'deletionTime', 'suspensionReason',
+               'thumbnailPhotoUrl', 'isEnrolledIn2Sv', 'isAdmin', 'relations', 'includeInGlobalAddressList',
+               'languages', 'ims', 'etag', 'lastLoginTime', 'orgUnitPath', 'agreedToTerms', 'externalIds',
+               'ipWhitelisted', 'sshPublicKeys', 'customSchemas', 'isEnforcedIn2Sv', 'isMailboxSetup',
+               'primaryEmail', 'password', 'emails', 'organizations', 'kind', 'hashFunction', 'name', 'gender',
+               'notes', 'creationTime', 'websites', 'changePasswordAtNextLogin', 'recoveryEmail', 'customerId',
+               'thumbnailPhotoEtag')  #: Top level keys of a Directory API User resource.
+
+    _JSON_FIELDS = tuple(field for field in _FIELDS
+                         if field not in ('name', 'customSchemas'))  #: Keys jsonify copies straight from attributes.
+    _filled = False  #: Set once fill_from_dict has run.
+
+    licensed_users_ttl = 300  #: Seconds that get_licensed_users reuses a previous result for.
+    _licensed_users_cache: Dict[str, Tuple[float, List[str]]] = {}  #: license_type: (time.monotonic(), users)
+    _LAZY_ATTRS = frozenset(_FIELDS + ('givenName', 'familyName', 'fullName', 'ad_account'))  #: Set by fill_from_dict
 
     def __init__(self, service, user_dict: Dict, lazy_load: bool = True):
         self.immutable_dict = user_dict
         self.service: GoogleService().directory_service = service
         self.dict = user_dict
-        self.fill_from_dict()
         if not lazy_load:
             self.groups = self.get_all_groups()
-        self.json = self.jsonify()
+
+    @staticmethod
+    @cache
+    def get_service_instance() -> GoogleService:
+        """
+        Connection to Google shared by every GoogleUser. Created the first time it is needed rather than when this
+        module is imported, so importing it never starts an OAuth flow.
+        Returns:
+            The shared GoogleService.
+        """
+        return GoogleService()
+
+    @staticmethod
+    @cache
+    def get_defaults() -> Dict:
+        """
+        Reads the default user settings from defaults_filepath the first time they are needed.
+        Returns:
+            Dictionary of default user attributes.
+        """
+        with open(GoogleUser.defaults_filepath, 'r') as defaults_file:
+            return json.load(defaults_file)
+
+    def __getattr__(self, name):
+        # Only called when normal lookup fails, i.e. for user attributes before fill_from_dict has run. Filling them
+        # on first use means bulk loads only pay for the users that are actually inspected.
+        if name in GoogleUser._LAZY_ATTRS and 'dict' in self.__dict__:
+            self.fill_from_dict()
+            return getattr(self, name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    @cached_property
+    def json(self) -> Dict:
+        """Google API friendly representation of the user. Built on first access."""
+        return self.jsonify()
 
     def fill_from_dict(self):
-        # TODO: Make this code more elegant
-        while True:
-            try:
-                self.addresses = self.dict['addresses']
-                self.posixAccounts = self.dict['posixAccounts']
-                self.phones = self.dict['phones']
-                self.locations = self.dict['locations']
-                self.isDelegatedAdmin = self.dict['isDelegatedAdmin']
-                self.recoveryPhone = self.dict['recoveryPhone']
-                self.suspended = self.dict['suspended']
-                self.keywords = self.dict['keywords']
-                self.id = self.dict['id']
-                self.aliases = self.dict['aliases']
-                self.nonEditableAliases = self.dict['nonEditableAliases']
-                self.archived = self.dict['archived']
-                self.deletionTime = self.dict['deletionTime']
-                self.suspensionReason = self.dict['suspensionReason']
-                self.thumbnailPhotoUrl = self.dict['thumbnailPhotoUrl']
-                self.isEnrolledIn2Sv = self.dict['isEnrolledIn2Sv']
-                self.isAdmin = self.dict['isAdmin']
-                self.relations = self.dict['relations']
-                self.includeInGlobalAddressList = self.dict['includeInGlobalAddressList']
-                self.languages = self.dict['languages']
-                self.ims = self.dict['ims']
-                self.etag = self.dict['etag']
-                self.lastLoginTime = self.dict['lastLoginTime']
-                self.orgUnitPath = self.dict['orgUnitPath']
-                self.agreedToTerms = self.dict['agreedToTerms']
-                self.externalIds = self.dict['externalIds']
-                self.ipWhitelisted = self.dict['ipWhitelisted']
-                self.sshPublicKeys = self.dict['sshPublicKeys']
-                self.customSchemas = self.dict['customSchemas']
-                self.isEnforcedIn2Sv = self.dict['isEnforcedIn2Sv']
-                self.isMailboxSetup = self.dict['isMailboxSetup']
-                self.primaryEmail = self.dict['primaryEmail']
-                self.password = self.dict['password']
-                self.emails = self.dict['emails']
-                self.organizations = self.dict['organizations']
-                self.kind = self.dict['kind']
-                self.hashFunction = self.dict['hashFunction']
-                self.name = self.dict['name']
-                self.givenName = self.name['givenName']
-                self.familyName = self.name['familyName']
-                self.fullName = self.name.get('fullName')
-                self.gender = self.dict['gender']
-                self.notes = self.dict['notes']
-                self.creationTime = self.dict['creationTime']
-                # TODO: Refactor this.
-                try:
-                    self.ad_account = \
-                    self.dict.get('customSchemas').get('Enhanced_desktop_security').get('AD_accounts')[0].get('value')
-                except AttributeError:
-                    self.ad_account = None
-                self.websites = self.dict['websites']
-                self.changePasswordAtNextLogin = self.dict['changePasswordAtNextLogin']
-                self.recoveryEmail = self.dict['recoveryEmail']
-                self.customerId = self.dict['customerId']
-                self.thumbnailPhotoEtag = self.dict['thumbnailPhotoEtag']
-                break
-            except KeyError as missing_key:
-                self.dict[str_missing_key(missing_key)] = None
-                continue
+        """
+        Helper method to fill attributes from self.dict. Fields missing from self.dict are filled with None, and keys
+        of self.dict that aren't in GoogleUser._FIELDS are ignored.
+        Runs automatically the first time one of the user's attributes is read. Attributes that were already assigned
+        before that are left as they are. Calling it again, e.g. after replacing self.dict with a fresh API response,
+        overwrites every field with the new values.
+
+        Returns:
+            None. Updates self.
+        """
+        user_dict = self.dict
+        fields = {field: user_dict.get(field) for field in GoogleUser._FIELDS}
+        name = fields['name'] or {}
+        fields['givenName'] = name.get('givenName')
+        fields['familyName'] = name.get('familyName')
+        fields['fullName'] = name.get('fullName')
+        # TODO: Refactor this.
+        try:
+            fields['ad_account'] = \
+            fields['customSchemas'].get('Enhanced_desktop_security').get('AD_accounts')[0].get('value')
+        except (AttributeError, IndexError, TypeError):
+            fields['ad_account'] = None
+        attrs = self.__dict__
+        if not self._filled:
+            # Attributes assigned before the first fill are edits to keep, not stale values to replace.
+            fields.update({key: attrs[key] for key in fields.keys() & attrs.keys()})
+        # One merge instead of a write per field.
+        attrs.update(fields)
+        self._filled = True
 
     def patch(self):
         """
@@ -97,7 +113,10 @@ class GoogleUser:
         Returns:
             API Call response
         """
-        result = self.service.users().patch(userKey=self.id, body=self.jsonify()).execute()
+        body = self.jsonify()
+        result = self.service.users().patch(userKey=self.id, body=body).execute()
+        # json is cached on first access, so replace it with what Google now holds rather than leave it stale.
+        self.json = body
         return result
 
     def jsonify(self) -> Dict:
@@ -106,64 +125,19 @@ class GoogleUser:
         Returns:
             Dictionary object representing what the Directory API expects in a JSON object.
         """
-        return {
-            # JSON template for User object in Directory API.
-            "addresses": self.addresses,
-            "posixAccounts": self.posixAccounts,
-            "phones": self.phones,
-            "locations": self.locations,
-            "isDelegatedAdmin": self.isDelegatedAdmin,  # Boolean indicating if the user is delegated admin (Read-only)
-            "recoveryPhone": self.recoveryPhone,
-            # Recovery phone of the user. The phone number must be in the E.164 format, starting with the plus sign (+). Example: +16506661212.
-            "suspended": self.suspended,  # Indicates if user is suspended.
-            "keywords": self.keywords,
-            "id": self.id,  # Unique identifier of User (Read-only)
-            "aliases": self.aliases,
-            "nonEditableAliases": self.nonEditableAliases,
-            "archived": self.archived,  # Indicates if user is archived.
-            "deletionTime": self.deletionTime,
-            "suspensionReason": self.suspensionReason,  # Suspension reason if user is suspended (Read-only)
-            "thumbnailPhotoUrl": self.thumbnailPhotoUrl,  # Photo Url of the user (Read-only)
-            "isEnrolledIn2Sv": self.isEnrolledIn2Sv,  # Is enrolled in 2-step verification (Read-only)
-            "isAdmin": self.isAdmin,  # Boolean indicating if the user is admin (Read-only)
-            "relations": self.relations,
-            "includeInGlobalAddressList": self.includeInGlobalAddressList,
-            # Boolean indicating if user is included in Global Address List
-            "languages": self.languages,
-            "ims": self.ims,
-            "etag": self.etag,  # ETag of the resource.
-            "lastLoginTime": self.lastLoginTime,  # User's last login time. (Read-only)
-            "orgUnitPath": self.orgUnitPath,  # OrgUnit of User
-            "agreedToTerms": self.agreedToTerms,  # Indicates if user has agreed to terms (Read-only)
-            "externalIds": self.externalIds,
-            "ipWhitelisted": self.ipWhitelisted,  # Boolean indicating if ip is whitelisted
-            "sshPublicKeys": self.sshPublicKeys,
-            "customSchemas": self.customSchemas,
-            "isEnforcedIn2Sv": self.isEnrolledIn2Sv,  # Is 2-step verification enforced (Read-only)
-            "isMailboxSetup": self.isMailboxSetup,  # Is mailbox setup (Read-only)
-            "primaryEmail": self.primaryEmail,  # username of User
-            "password": self.password,  # User's password
-            "emails": self.emails,
-            "organizations": self.organizations,
-            "kind": self.kind,  # Kind of resource this is.
-            "hashFunction": self.hashFunction,  # Hash function name for password. Supported are MD5, SHA-1 and crypt
-            "name": {  # JSON template for name of a user in Directory API. # User's name
-                "givenName": self.givenName,  # First Name
-                "fullName": self.fullName,  # Full Name
-                "familyName": self.familyName,  # Last Name
-            },
-            "gender": self.gender,
-            "notes": self.notes,
-            "creationTime": self.creationTime,  # User's G Suite account creation time. (Read-only)
-            "customSchemas": {
-                'Enhanced_desktop_security': {'AD_accounts': [{'type': 'work', 'value': self.ad_account}]}},
-            "websites": self.websites,
-            "changePasswordAtNextLogin": self.changePasswordAtNextLogin,
-            # Boolean indicating if the user should change password in next login
-            "recoveryEmail": self.recoveryEmail,  # Recovery email of the user.
-            "customerId": self.customerId,  # CustomerId of User (Read-only)
-            "thumbnailPhotoEtag": self.thumbnailPhotoEtag,  # ETag of the user's photo (Read-only)
+        if not self._filled:
+            self.fill_from_dict()
+        attrs = self.__dict__
+        json_dict = {field: attrs[field] for field in GoogleUser._JSON_FIELDS}
+        json_dict['name'] = {  # JSON template for name of a user in Directory API. # User's name
+            "givenName": self.givenName,  # First Name
+            "fullName": self.fullName,  # Full Name
+            "familyName": self.familyName,  # Last Name
         }
+        custom_schemas = dict(self.customSchemas or {})
+        custom_schemas['Enhanced_desktop_security'] = {'AD_accounts': [{'type': 'work', 'value': self.ad_account}]}
+        json_dict['customSchemas'] = custom_schemas
+        return json_dict
 
     def assign_license(self, license_type: str):
         """
@@ -181,7 +155,8 @@ class GoogleUser:
         teacher_license_skuId = '1010310002'
         body = {'userId': self.primaryEmail}
         if license_type == "Teacher":
-            self.licensing_service.licenseAssignments().insert(productId='101031', skuId='1010310002', body=body).execute()
+            licensing_service = GoogleUser.get_service_instance().licensing_service
+            licensing_service.licenseAssignments().insert(productId='101031', skuId='1010310002', body=body).execute()
         elif license_type == "Student":
             pass
         else:
@@ -194,64 +169,130 @@ class GoogleUser:
         Returns:
             List of GoogleGroups object where GoogleUser in GoogleGroup.members == True
         """
-        groups = []
         result = self.service.groups().list(userKey=self.primaryEmail).execute()
+        return self.groups_from_result(result)
+
+    def groups_from_result(self, result: Dict) -> List[GoogleGroup]:
+        """
+        Helper method that turns a groups().list response into GoogleGroups.
+        Args:
+            result: Response of a groups().list(userKey=...) request for this user.
+
+        Returns:
+            List of GoogleGroups in the response.
+        """
+        groups = []
+        settings_service = GoogleUser.get_service_instance().group_settings_service
         if result.get('groups'):
             for group in result.get('groups'):
                 groups.append(GoogleGroup(service=self.service,
-                                          settings_service=GoogleService.get_group_settings_service(),
+                                          settings_service=settings_service,
                                           group=group))
         return groups
 
+    @staticmethod
+    def bulk_load_groups(service: GoogleService().directory_service, users: List[GoogleUser]) -> Dict[str, Exception]:
+        """
+        Loads the groups of many users at once, setting each user's groups attribute. The groups().list requests are
+        sent through Google's batch endpoint, GoogleGroup.batch_size at a time, so each batch costs a single
+        round-trip instead of one per user. Users in more groups than fit in one page have the rest requested after.
+        Args:
+            service: GoogleService().directory_service
+            users: GoogleUsers to load the groups of.
+
+        Returns:
+            Dict of primaryEmail to the error raised for every user whose groups couldn't be loaded. Those users are
+            left without a groups attribute.
+        """
+        results: Dict[int, Dict] = {}
+        failures = {}
+
+        def callback(request_id, response, exception):
+            if exception is not None:
+                failures[users[int(request_id)].primaryEmail] = exception
+            else:
+                results[int(request_id)] = response
+
+        for start in range(0, len(users), GoogleGroup.batch_size):
+            batch = service.new_batch_http_request(callback=callback)
+            for i in range(start, min(start + GoogleGroup.batch_size, len(users))):
+                batch.add(service.groups().list(userKey=users[i].primaryEmail, maxResults=200), request_id=str(i))
+            batch.execute()
+        for i, result in results.items():
+            user = users[i]
+            groups = user.groups_from_result(result)
+            request = service.groups().list(userKey=user.primaryEmail, maxResults=200)
+            while result.get('nextPageToken'):
+                request = service.groups().list_next(request, result)
+                result = request.execute()
+                groups.extend(user.groups_from_result(result))
+            user.groups = groups
+        return failures
+
 
     @staticmethod
-    def get_licensed_users(license_type: str) -> List[str]:
+    def iter_licensed_users(license_type: str) -> Iterator[str]:
         """
-        Get a list of users who have assigned Google Workspace Licenses
+        Streams the users who have assigned Google Workspace Licenses straight from the API, a page at a time.
         Args:
             license_type: string of either Teacher or Student
 
-        Returns:
-            List of GoogleUser.primaryEmail
+        Yields:
+            GoogleUser.primaryEmail of each licensed user.
         """
         # TODO: Remove hardcoded values
         license_productId = '101031'
         teacher_license_skuId = '1010310002'
-        page_token = "Dummy"
-        licenses = []
         if license_type == "Teacher":
-            while page_token:
-                result = GoogleUser.licensing_service.licenseAssignments().listForProductAndSku(productId=license_productId,
-                                                                                          skuId=teacher_license_skuId,
-                                                                                          customerId='springfield-schools.org',
-                                                                                          pageToken=page_token,
-                                                                                          maxResults=1000).execute()
-                for item in result.get('items'):
-                    licenses.append(item)
-                page_token = result.get('nextPageToken')
+            license_assignments = GoogleUser.get_service_instance().licensing_service.licenseAssignments()
+            request = license_assignments.listForProductAndSku(productId=license_productId,
+                                                               skuId=teacher_license_skuId,
+                                                               customerId='springfield-schools.org',
+                                                               maxResults=1000)
+            while request is not None:
+                result = request.execute()
+                for item in result.get('items', []):
+                    yield item.get('userId')
+                request = license_assignments.listForProductAndSku_next(request, result)
         elif license_type == "Student":
             pass
         else:
             raise ValueError('Invalid license type. Specify either Teacher or Student')
-        users = []
-        for license in licenses:
-            users.append(license.get('userId'))
-        return users
 
     @staticmethod
-    def get_user_by_email(service: GoogleService().directory_service, email: str, lazy_load: bool=True) -> GoogleUser:
+    def get_licensed_users(license_type: str) -> List[str]:
+        """
+        Get a list of users who have assigned Google Workspace Licenses
+        Args:
+            license_type: string of either Teacher or Student
+
+        Returns:
+            List of GoogleUser.primaryEmail. Repeat calls within licensed_users_ttl seconds reuse the last result.
+        """
+        cached = GoogleUser._licensed_users_cache.get(license_type)
+        if cached and time.monotonic() - cached[0] < GoogleUser.licensed_users_ttl:
+            return list(cached[1])
+        users = list(GoogleUser.iter_licensed_users(license_type))
+        GoogleUser._licensed_users_cache[license_type] = (time.monotonic(), users)
+        return list(users)
+
+    @staticmethod
+    def get_user_by_email(service: GoogleService().directory_service, email: str, lazy_load: bool=True,
+                          fields: str = None) -> GoogleUser:
         """
         Gets a single GoogleUser by their email
         Args:
             service: GoogleService.directory_service object used to make the query.
             email: the email of the user we want
             lazy_load: Do we want to load things like their groups?
+            fields: Optional partial response selector, e.g. 'id,primaryEmail,name'. Attributes that aren't
+                requested are None. Leave unset to get every field.
 
         Returns:
             A single GoogleUser object
         """
         # TODO: Error handling
-        result: Dict = service.users().get(userKey=email, projection='full').execute()
+        result: Dict = service.users().get(userKey=email, projection='full', fields=fields).execute()
         user: GoogleUser = GoogleUser(service, result, lazy_load=lazy_load)
         return user
 
@@ -280,7 +321,7 @@ class GoogleUser:
         }
         if optionalValues:
             for k, v in optionalValues.items():
-                if v is not None and k not in body.keys():
+                if v is not None and k not in body:
                     body[k] = v
                 if k == 'fullName':
                     body['name'] = {
@@ -288,11 +329,8 @@ class GoogleUser:
                         "givenName": givenName,
                         "fullName": v
                     }
-        config_filepath = Path(Path(__file__).parents[2], 'config', 'google_user_defaults.json')
-        with open(config_filepath, 'r') as config_file:
-            config = json.load(config_file)
-        for k, v in config.items():
-            if v is not None and k not in body.keys():
+        for k, v in GoogleUser.get_defaults().items():
+            if v is not None and k not in body:
                 body[k] = v
         return body
 
@@ -316,54 +354,149 @@ class GoogleUser:
         return GoogleUser(service, result)
 
     @staticmethod
-    def get_all_users(service: GoogleService().directory_service, query: str = 'orgUnitPath=/') -> List[GoogleUser]:
+    def iter_all_users(service: GoogleService().directory_service, query: str = 'orgUnitPath=/',
+                       fields: str = None) -> Iterator[GoogleUser]:
+        """
+        Query Google Workspace for all GoogleUsers within a given OU, recursing through sub-OUs, yielding them a page
+        at a time so the first users can be worked on as soon as the first page arrives.
+        Args:
+            service: GoogleService().directory_service
+            query: Can be a custom query for users().list(), or use orgUnitPath=/ to get everyone.
+            fields: Optional partial response selector. Must include nextPageToken, e.g.
+                'nextPageToken,users(id,primaryEmail,name,orgUnitPath)'. Leave unset to get every field.
+
+        Yields:
+            Every GoogleUser that matches the query.
+        """
+        print("Loading all GSuite Users. This may take awhile.")
+        users = service.users()
+        request = users.list(customer='my_customer',
+                             projection='full',
+                             maxResults=500,
+                             query=query,
+                             fields=fields)
+        while request is not None:
+            results = request.execute()
+            for user in results.get('users', []):
+                yield GoogleUser(service=service, user_dict=user)
+            # list_next copies the previous request and only swaps in the new pageToken.
+            request = users.list_next(request, results)
+
+    @staticmethod
+    def get_all_users(service: GoogleService().directory_service, query: str = 'orgUnitPath=/',
+                      fields: str = None, lazy_load: bool = True) -> List[GoogleUser]:
         """
         Query Google Workspace and return all GoogleUsers within a given OU, recurses through sub-OUs.
+        Use iter_all_users instead to start on the users before every page has been fetched.
         Args:
             service: GoogleService().directory_service
             query: Can be a custom query for users().list(), or use orgUnitPath=/ to get everyone.
+            fields: Optional partial response selector. Must include nextPageToken, e.g.
+                'nextPageToken,users(id,primaryEmail,name,orgUnitPath)'. Leave unset to get every field.
+            lazy_load: Set to False to also load every user's groups, using bulk_load_groups.
 
         Returns:
             A list of all GoogleUsers that match the query.
+
+        Raises:
+            HttpError: If lazy_load is False and a user's groups still can't be loaded when requested on their own.
         """
-        print("Loading all GSuite Users. This may take awhile.")
+        out_list = list(GoogleUser.iter_all_users(service, query=query, fields=fields))
+        if not lazy_load:
+            failures = GoogleUser.bulk_load_groups(service, out_list)
+            if failures:
+                # Retry each failed user on its own, which raises the error if it wasn't transient, as loading users
+                # one at a time did, instead of leaving them without a groups attribute.
+                for user in out_list:
+                    if user.primaryEmail in failures:
+                        user.groups = user.get_all_groups()
+        return out_list
+
+    @staticmethod
+    def quote_query_value(value: str) -> str:
+        """
+        Helper method to quote a value for a users().list() search query, so values containing spaces or apostrophes
+        (e.g. an OU named "Teachers' Aides") still form a valid query.
+        Args:
+            value: Raw value, such as an org unit path.
+
+        Returns:
+            The value in single quotes, with backslashes and single quotes escaped with a backslash.
+        """
+        escaped = value.replace('\\', '\\\\').replace("'", "\\'")
+        return f"'{escaped}'"
+
+    @staticmethod
+    def get_users_in_org_units(service: GoogleService().directory_service, org_unit_paths: List[str],
+                               max_workers: int = 8, fields: str = None) -> List[GoogleUser]:
+        """
+        Query Google Workspace for all GoogleUsers in several OUs at once, recursing through sub-OUs. Each OU is paged
+        through on its own thread, so the wall time is roughly that of the largest OU instead of the sum of them all.
+        Users found in more than one of the OUs (e.g. a parent and its child were both given) are only returned once.
+        Args:
+            service: GoogleService().directory_service
+            org_unit_paths: Full paths of the OUs to load, e.g. ['/Students', '/Staff'].
+            max_workers: Most OUs to load at the same time.
+            fields: Optional partial response selector. Must include nextPageToken and users(id), e.g.
+                'nextPageToken,users(id,primaryEmail,name,orgUnitPath)'. Leave unset to get every field.
+
+        Returns:
+            A list of all GoogleUsers in the given OUs.
+        """
+        print("Loading GSuite Users. This may take awhile.")
+        creds = GoogleService.get_credentials()
+
+        def list_org_unit(org_unit_path: str) -> List[Dict]:
+            # httplib2 connections can't be shared between threads, so every OU is requested over its own.
+            http = AuthorizedHttp(creds, http=httplib2.Http(timeout=GoogleService.http_timeout))
+            users = []
+            request = service.users().list(customer='my_customer',
+                                           projection='full',
+                                           maxResults=500,
+                                           query=f"orgUnitPath={GoogleUser.quote_query_value(org_unit_path)}",
+                                           fields=fields)
+            while request is not None:
+                results = request.execute(http=http)
+                users.extend(results.get('users', []))
+                request = service.users().list_next(request, results)
+            return users
+
         out_list = []
-        nextPageToken = 'dummy'
-        while nextPageToken != '':
-            if nextPageToken == 'dummy':
-                results = service.users().list(customer='my_customer',
-                                               projection='full',
-                                               maxResults=500,
-                                               query=query).execute()
-            else:
-                results = service.users().list(customer='my_customer',
-                                               projection='full',
-                                               maxResults=500,
-                                               query=query,
-                                               pageToken=nextPageToken).execute()
-            try:
-                nextPageToken = results['nextPageToken']
-            except KeyError:
-                nextPageToken = ''
-            try:
-                results = results['users']
-            except KeyError:
-                return []
-            if results:
-                for user in results:
-                    out_list.append(GoogleUser(service=service, user_dict=user))
-        if len(out_list) > 0:
-            return out_list
-        else:
-            return []
+        seen_ids = set()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for users in executor.map(list_org_unit, org_unit_paths):
+                for user in users:
+                    if user['id'] not in seen_ids:
+                        seen_ids.add(user['id'])
+                        out_list.append(GoogleUser(service=service, user_dict=user))
+        return out_list
 
     @staticmethod
     def get_user_email_from_id(id: str):
         # TODO: Figure out what this method does.
         try:
-            result = GoogleUser.service.users().get(userKey=id).execute()
-            return result['primaryEmail']
+            return GoogleUser.fetch_user_email(id)
         except HttpError:
             return f'Could not find a user with the id: {id}'
 
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def fetch_user_email(id: str) -> str:
+        """
+        Looks up a user's primary email by their id. Only successful lookups are cached, since lru_cache does not
+        remember calls that raise, so a transient API error is retried on the next call.
+
+        Args:
+            id: Google's id for the user.
+
+        Returns:
+            The user's primary email.
+
+        Raises:
+            HttpError: If Google could not return the user.
+        """
+        service = GoogleUser.get_service_instance().directory_service
+        result = service.users().get(userKey=id, fields='primaryEmail').execute()
+        return result['primaryEmail']
+
     # todo: methods - Reset password? add to group, remove from group, enable/disable/ alter fields
\ No newline at end of file
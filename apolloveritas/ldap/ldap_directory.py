@@ -1,21 +1,27 @@
 from __future__ import annotations
-from ldap3 import Server, Connection, ALL, SUBTREE, ObjectDef, LEVEL, MODIFY_REPLACE, MODIFY_DELETE, MODIFY_ADD
-from json import load
+from ldap3 import Server, Connection, ALL, BASE, SUBTREE, ObjectDef, LEVEL, MODIFY_REPLACE, MODIFY_DELETE, MODIFY_ADD
+from ldap3.utils.conv import escape_filter_chars
+from json import loads
 from pathlib import Path
-from typing import List, Dict, Union
+from functools import cache
+from operator import attrgetter
+from typing import List, Dict, Iterator, Union
 import re
 
-from apolloveritas.utils.utils import str_missing_key
-
 # TODO: remove pattern of explicit return None
 # TODO: implement custom exception handling
 
+_OU_RE = re.compile(r'OU=(.+?),')  # Captures each OU name in a DN.
+# Matches "CN={cn}," at the start of a DN, including any escaped commas in the cn.
+_FIRST_RDN_RE = re.compile(r'(?:\\.|[^\\,])*,')
+
+
 class LdapDirectory:
-    """Represents the directory itself. Wrapper for ldap3. Class properties are pulled in from the config
-    directory. Class props are passed in as default instance props.
+    """Represents the directory itself. Wrapper for ldap3. Settings are read from the config directory the first
+    time a directory is created, and are used for any connection arguments that aren't passed in.
 
     Args:
-        server (str): hostname or IP address of the server.
+        server (ldap3.Server): Domain Controller to connect to. Defaults to the host in the config file.
         user (str): distinguishedName of the user that binds to the ldap server.
         password (str): that user's password.
         base_dn (str): OU we want to limit this program's access to.
@@ -43,45 +49,233 @@ class LdapDirectory:
     """
     # TODO: redo configuration to environment variables
     config_filepath = Path(Path(__file__).parents[2], 'creds', 'ldap.json')
-    with open(config_filepath, 'r') as config_file:
-        config = load(config_file)
-    host = config['host']
-    # TODO: Allow configuration of ssl and port for people with bad security practices
-    # TODO: Create helper script to configure ADCA and add a cert to the Domain Controller.
-    server = Server(host, use_ssl=True, port=636, get_info=ALL)
-    user = config['user']
-    password = config['password']
-    base_dn = config['base_dn']
     exclusion_filepath = Path(Path(__file__).parents[2], 'config', 'ldap_exclusions.json')
-    with open(exclusion_filepath, 'r') as exclusion_file:
-        exclusions = load(exclusion_file)
     target_filepath = Path(Path(__file__).parents[2], 'config', 'ldap_sync_targets.json')
-    with open(target_filepath, 'r') as target_file:
-        targets = load(target_file)
-
-    def __init__(self, server=server, user=user, password=password, base_dn=base_dn, lazy_load: bool = False):
-        self.conn = Connection(server,
-                               user=user,
-                               password=password,
+    page_size = 1000  #: Entries per page when loading users or groups. AD's default MaxPageSize.
+    # Filters for the single entry lookups. Values are escaped with escape_filter_chars before being formatted in.
+    _USER_BY_SAM = '(&(objectclass=user)(sAMAccountName={}))'
+    _USER_BY_EMPLOYEEID = '(&(objectclass=user)(employeeId={}))'
+    _USER_BY_MAIL = '(&(objectclass=user)(mail={}))'
+    _GROUP_BY_SAM = '(&(objectclass=group)(sAMAccountName={}))'
+    _lazy_directory: LdapDirectory = None  #: Shared directory returned by get_lazy_directory.
+
+    def __init__(self, server: Server = None, user: str = None, password: str = None, base_dn: str = None,
+                 lazy_load: bool = False):
+        config = LdapDirectory.load_json(LdapDirectory.config_filepath)
+        self.server: Server = server or LdapDirectory.get_server(config['host'])
+        self.host: str = self.server.host
+        self.user: str = user or config['user']
+        self.password: str = password or config['password']
+        self.exclusions: Dict = LdapDirectory.load_json(LdapDirectory.exclusion_filepath)
+        self.targets: Dict = LdapDirectory.load_json(LdapDirectory.target_filepath)
+        self.conn = Connection(self.server,
+                               user=self.user,
+                               password=self.password,
+                               # Requested attributes an entry doesn't have are left out, as with '*', not set to [].
+                               return_empty_attributes=False,
                                auto_bind=True, )  #: Can be used to access python-ldap3 functions directly.
-        self.excludedOrganizationalUnits = LdapDirectory.exclusions['organizationalUnits']
-        self.excludedUsers = LdapDirectory.exclusions['users']
-        self.excludedGroups = LdapDirectory.exclusions['groups']
-        self.includedOrganizationalUnits = LdapDirectory.targets['organizationalUnits']
-        self.includedUsers = LdapDirectory.targets['users']
-        self.includedGroups = LdapDirectory.targets['groups']
-        self.conn.bind()
+        self.excludedOrganizationalUnits = self.exclusions['organizationalUnits']
+        self.excludedUsers = self.exclusions['users']
+        self.excludedGroups = self.exclusions['groups']
+        self.includedOrganizationalUnits = self.targets['organizationalUnits']
+        self.includedUsers = self.targets['users']
+        self.includedGroups = self.targets['groups']
+        self.compile_exclusions()
         self.obj_user = ObjectDef('user', self.conn)
         self.obj_group = ObjectDef('group', self.conn)
-        self.base_dn = base_dn
+        self.base_dn = base_dn or config['base_dn']
         self.lazyLoaded = lazy_load
         if not self.lazyLoaded:
-            print('Loading all LDAP users, this may take awhile.')
-            self.all_users: List[LdapUser] = self.get_all_users()
-            self.users: List[LdapUser] = self.remove_excluded_users(self.all_users)
-            self.disabled_users: List[LdapUser] = [user for user in self.all_users if user.userAccountControl == 514]
+            self.load_users()
             self.all_groups: List[LdapGroup] = self.get_all_groups()
             self.groups: List[LdapGroup] = self.remove_excluded_groups(self.all_groups)
+            self.index_users()
+            self.index_groups()
+
+    @staticmethod
+    @cache
+    def load_json(filepath: Path) -> Dict:
+        """
+        Reads a JSON configuration file the first time it is needed. Later calls return the same parsed dict.
+
+        Args:
+            filepath: Path of the JSON file.
+
+        Returns:
+            The parsed file.
+        """
+        # json.loads detects the encoding of bytes itself, so the file is read in one call without a text wrapper.
+        return loads(filepath.read_bytes())
+
+    @staticmethod
+    @cache
+    def get_server(host: str) -> Server:
+        """
+        Domain Controller that directories connect to, created once per host.
+
+        Args:
+            host: hostname or ip address of the controller.
+
+        Returns:
+            ldap3.Server for host.
+        """
+        # TODO: Allow configuration of ssl and port for people with bad security practices
+        # TODO: Create helper script to configure ADCA and add a cert to the Domain Controller.
+        return Server(host, use_ssl=True, port=636, get_info=ALL)
+
+    @staticmethod
+    def get_lazy_directory() -> LdapDirectory:
+        """
+        Lazy loaded directory shared by methods that write changes, such as LdapUser.modify and
+        LdapGroup.add_member, so they bind once per process instead of opening a new connection on every call.
+        If the connection has been closed, e.g. by the server's idle timeout, it is opened and bound again first.
+
+        Returns:
+            The shared lazy loaded LdapDirectory.
+        """
+        directory = LdapDirectory._lazy_directory
+        if directory is None:
+            directory = LdapDirectory._lazy_directory = LdapDirectory(lazy_load=True)
+        elif directory.conn.closed:
+            # bind() reopens a closed connection before binding.
+            directory.conn.bind()
+        return directory
+
+    def load_users(self) -> None:
+        """
+        Loads self.all_users, self.users and self.disabled_users in a single pass over the directory, sorting each
+        user into the lists it belongs to as it arrives.
+
+        Returns:
+            None. Updates self.
+        """
+        all_users: List[LdapUser] = []
+        users: List[LdapUser] = []
+        disabled_users: List[LdapUser] = []
+        all_users_append = all_users.append
+        users_append = users.append
+        disabled_users_append = disabled_users.append
+        is_sync_safe_user = self.is_sync_safe_user
+        for user in self.iter_all_users():
+            all_users_append(user)
+            if user.userAccountControl == 514:
+                disabled_users_append(user)
+            elif is_sync_safe_user(user):
+                users_append(user)
+        self.all_users = all_users
+        self.users = users
+        self.disabled_users = disabled_users
+
+    def compile_exclusions(self) -> None:
+        """
+        Converts the exclusion and target lists into sets and regular expressions, so filtering a user or group
+        costs a few hash lookups and one regex search rather than a scan of every list.
+
+        Returns:
+            None. Updates self.
+        """
+        self._excluded_users_set = set(self.excludedUsers)
+        self._excluded_groups_set = set(self.excludedGroups)
+        self._included_ous_set = set(self.includedOrganizationalUnits)
+        self._excluded_ou_re = LdapDirectory.substring_re(self.excludedOrganizationalUnits)
+        # Groups skip an excluded OU that is itself a target, rather than checking the group's own OU.
+        self._excluded_group_ou_re = LdapDirectory.substring_re(
+            [ou for ou in self.excludedOrganizationalUnits if ou not in self._included_ous_set])
+
+    @staticmethod
+    def substring_re(substrings: List[str]) -> re.Pattern | None:
+        """
+        Helper method to build a regex matching any string containing one of substrings.
+
+        Args:
+            substrings: Literal strings to search for.
+
+        Returns:
+            Compiled pattern, or None if there are no substrings, since an empty pattern would match everything.
+        """
+        if not substrings:
+            return None
+        return re.compile('|'.join(map(re.escape, substrings)))
+
+    def index_users(self) -> None:
+        """
+        Builds the lookup tables used by the get_cached_user methods from self.all_users, so each lookup is a single
+        dictionary access instead of a scan of every user.
+
+        Returns:
+            None. Updates self.
+        """
+        self._users_by_dn: Dict[str, LdapUser] = {}
+        self._users_by_sam: Dict[str, LdapUser] = {}
+        self._users_by_employeeid: Dict[str, LdapUser] = {}
+        for user in self.all_users:
+            self.index_user(user)
+
+    def index_user(self, user: LdapUser) -> None:
+        """
+        Adds a single user to the get_cached_user lookup tables. If two users share a value the first one indexed
+        is kept, matching what a scan of self.all_users would find.
+
+        Args:
+            user: user to index.
+
+        Returns:
+            None. Updates self.
+        """
+        self._users_by_dn.setdefault(user.distinguishedName, user)
+        self._users_by_sam.setdefault(user.sAMAccountName, user)
+        if user.employeeId is not None:
+            self._users_by_employeeid.setdefault(user.employeeId, user)
+
+    def index_groups(self) -> None:
+        """
+        Builds the lookup tables used by the get_cached_group methods from self.groups.
+
+        Returns:
+            None. Updates self.
+        """
+        self._groups_by_dn: Dict[str, LdapGroup] = {}
+        self._groups_by_sam: Dict[str, LdapGroup] = {}
+        for group in self.groups:
+            self.index_group(group)
+
+    def index_group(self, group: LdapGroup) -> None:
+        """
+        Adds a single group to the get_cached_group lookup tables.
+
+        Args:
+            group: group to index.
+
+        Returns:
+            None. Updates self.
+        """
+        self._groups_by_dn.setdefault(group.distinguishedName, group)
+        self._groups_by_sam.setdefault(group.sAMAccountName, group)
+
+    def search_single(self, object_type: type, search_filter: str, search_base: str = None,
+                      search_scope: str = SUBTREE) -> LdapUser | LdapGroup | None:
+        """
+        Helper method for lookups that should match exactly one entry. Uses a plain search limited to two results,
+        which is enough to tell one match from several without paging.
+
+        Args:
+            object_type: LdapUser or LdapGroup, used to wrap the result and pick which attributes to request.
+            search_filter: LDAP filter that should match a single entry.
+            search_base: DN to search from. If not specified, searches from self.base_dn.
+            search_scope: SUBTREE to search below search_base, or BASE to only match search_base itself.
+
+        Returns:
+            The single matching entry, or None if nothing or more than one entry matched.
+        """
+        self.conn.search(search_base=search_base or self.base_dn,
+                         search_filter=search_filter,
+                         search_scope=search_scope,
+                         attributes=list(object_type.LDAP_ATTRS),
+                         size_limit=2)
+        entries = [entry for entry in self.conn.response if entry.get('type') == 'searchResEntry']
+        if len(entries) == 1:
+            return object_type(entries[0])
+        return None
 
     def get_user_by_sam(self, sam: str) -> LdapUser | None:
         """
@@ -91,20 +285,13 @@ class LdapDirectory:
             sam: sAMAccountName of the user you want to return. Must match exactly one user.
 
         Returns:
-            Single user.
+            Single user. If this directory is loaded, a cached user is returned without searching.
         """
-        user_objects = []
-        entry_generator = self.conn.extend.standard.paged_search(search_base=self.base_dn,
-                                                                 search_filter=f'(&(objectclass=user)(sAMAccountName={sam}))',
-                                                                 attributes=['*'],
-                                                                 paged_size=1000,
-                                                                 generator=True)
-        for user in entry_generator:
-            user_objects.append(LdapUser(user))
-        if len(user_objects) == 1:
-            return user_objects[0]
-        else:
-            return None
+        if not self.lazyLoaded:
+            user = self._users_by_sam.get(sam)
+            if user is not None:
+                return user
+        return self.search_single(LdapUser, LdapDirectory._USER_BY_SAM.format(escape_filter_chars(sam)))
 
     def get_user_by_employeeid(self, employeeid: str) -> LdapUser | None:
         """
@@ -114,20 +301,14 @@ class LdapDirectory:
             employeeid: sAMAccountName of the user you want to return. Must match exactly one user.
 
         Returns:
-            Single user.
+            Single user. If this directory is loaded, a cached user is returned without searching.
         """
-        user_objects = []
-        entry_generator = self.conn.extend.standard.paged_search(search_base=self.base_dn,
-                                                                 search_filter=f'(&(objectclass=user)(employeeId={employeeid}))',
-                                                                 attributes=['*'],
-                                                                 paged_size=1000,
-                                                                 generator=True)
-        for user in entry_generator:
-            user_objects.append(LdapUser(user))
-        if len(user_objects) == 1:
-            return user_objects[0]
-        else:
-            return None
+        if not self.lazyLoaded:
+            user = self._users_by_employeeid.get(str(employeeid))
+            if user is not None:
+                return user
+        search_filter = LdapDirectory._USER_BY_EMPLOYEEID.format(escape_filter_chars(str(employeeid)))
+        return self.search_single(LdapUser, search_filter)
 
     def get_user_by_mail(self, mail: str) -> LdapUser | None:
         """
@@ -139,18 +320,7 @@ class LdapDirectory:
         Returns:
             Single user.
         """
-        user_objects = []
-        entry_generator = self.conn.extend.standard.paged_search(search_base=self.base_dn,
-                                                                 search_filter=f'(&(objectclass=user)(mail={mail}))',
-                                                                 attributes=['*'],
-                                                                 paged_size=1000,
-                                                                 generator=True)
-        for user in entry_generator:
-            user_objects.append(LdapUser(user))
-        if len(user_objects) == 1:
-            return user_objects[0]
-        else:
-            return None
+        return self.search_single(LdapUser, LdapDirectory._USER_BY_MAIL.format(escape_filter_chars(mail)))
 
     def get_user_by_dn(self, dn: str) -> LdapUser | None:
         """
@@ -160,43 +330,30 @@ class LdapDirectory:
             dn: distinguishedName of user. Must be exactly correct or returns none.
 
         Returns:
-            Single User.
+            Single User. If this directory is loaded, a cached user is returned without searching.
         """
-        user_objects = []
-        entry_generator = self.conn.extend.standard.paged_search(search_base=dn,
-                                                                 search_filter='(objectclass=user)',
-                                                                 attributes=['*'],
-                                                                 paged_size=1,
-                                                                 generator=True)
-        for user in entry_generator:
-            user_objects.append(LdapUser(user))
-        if len(user_objects) > 1:
-            print("More than one result obtained.")
-            return None
-        if len(user_objects) == 1:
-            return user_objects[0]
-        else:
-            return None
+        if not self.lazyLoaded:
+            user = self._users_by_dn.get(dn)
+            if user is not None:
+                return user
+        return self.search_single(LdapUser, '(objectclass=user)', search_base=dn, search_scope=BASE)
 
     def get_cached_user_by_dn(self, dn: str) -> LdapUser:
-        for user in self.all_users:
-            if user.distinguishedName == dn:
-                return user
-        raise ValueError(dn)
+        user = self._users_by_dn.get(dn)
+        if user is None:
+            raise ValueError(dn)
+        return user
 
     def get_cached_user_by_sam(self, sam: str) -> LdapUser:
-        for user in self.all_users:
-            if user.sAMAccountName == sam:
-                return user
-        # TODO: Refactor to return None or custom error
-        raise ValueError(sam)
+        user = self._users_by_sam.get(sam)
+        if user is None:
+            # TODO: Refactor to return None or custom error
+            raise ValueError(sam)
+        return user
 
     def get_cached_user_by_employeeid(self, employeeid: str) -> LdapUser | None:
         employeeid = str(employeeid)  # ensures that integer values are converted to a string
-        for user in self.all_users:
-            if user.employeeId == employeeid:
-                return user
-        return None
+        return self._users_by_employeeid.get(employeeid)
 
     def get_all_users(self, ou: str = None, recurse: bool = True) -> List[LdapUser]:
         """
@@ -206,13 +363,26 @@ class LdapDirectory:
             ou (str): limit search to a specific OU. If not specified, searches from self.base_dn.
             recurse (bool): Should this function check the whole subtree?
         Returns:
-             List[LdapUser]: List of all LdapUser objects in the domain
+             List[LdapUser]: List of all LdapUser objects in the domain. Use iter_all_users instead when the users
+             only need to be looped over once.
+
+        """
+        return list(self.iter_all_users(ou, recurse))
+
+    def iter_all_users(self, ou: str = None, recurse: bool = True) -> Iterator[LdapUser]:
+        """
+        Function to stream ALL users as the search returns them. Does not process exclusions.
+
+        Args:
+            ou (str): limit search to a specific OU. If not specified, searches from self.base_dn.
+            recurse (bool): Should this function check the whole subtree?
+        Yields:
+             LdapUser: Every LdapUser object in the domain
 
         """
         print("Loading all LDAP users. This may take awhile.")
         if not ou:
             ou = self.base_dn
-        user_objects = []
         if recurse:
             search_scope = SUBTREE
         else:
@@ -220,14 +390,12 @@ class LdapDirectory:
         entry_generator = self.conn.extend.standard.paged_search(search_base=ou,
                                                                  search_filter='(objectclass=user)',
                                                                  search_scope=search_scope,
-                                                                 attributes=['*'],
-                                                                 paged_size=1000,
+                                                                 attributes=list(LdapUser.LDAP_ATTRS),
+                                                                 paged_size=LdapDirectory.page_size,
+                                                                 paged_criticality=True,
                                                                  generator=True)
         for user in entry_generator:
-            user_objects.append(LdapUser(user))
-        if len(user_objects) > 0:
-            return user_objects
-        return user_objects
+            yield LdapUser(user)
 
     def new_user(self, user: LdapUser) -> LdapUser:
         """
@@ -254,7 +422,10 @@ class LdapDirectory:
             object_class=['person', 'user'],
             attributes=user.safeDict
         )
-        return self.get_user_by_sam(user.sAMAccountName)
+        new_user = self.get_user_by_sam(user.sAMAccountName)
+        if new_user and not self.lazyLoaded:
+            self.cache_user(new_user)
+        return new_user
 
     def new_group(self, mocked_group: LdapGroup) -> LdapGroup:
         existing_group = self.get_group_by_sam(mocked_group.sAMAccountName)
@@ -268,10 +439,45 @@ class LdapDirectory:
         new_group = self.get_group_by_sam(mocked_group.sAMAccountName)
         if new_group:
             print(f'Made new group: {mocked_group.sAMAccountName}')
+            if not self.lazyLoaded:
+                self.cache_group(new_group)
             return new_group
         else:
             raise ValueError
 
+    def cache_user(self, user: LdapUser) -> None:
+        """
+        Adds a user created after loading to the cached user lists and lookup tables, applying the same exclusions
+        as loading did.
+
+        Args:
+            user: user to cache.
+
+        Returns:
+            None. Updates self.
+        """
+        self.all_users.append(user)
+        self.users.extend(self.remove_excluded_users([user]))
+        if user.userAccountControl == 514:
+            self.disabled_users.append(user)
+        self.index_user(user)
+
+    def cache_group(self, group: LdapGroup) -> None:
+        """
+        Adds a group created after loading to the cached group lists and lookup tables, applying the same exclusions
+        as loading did.
+
+        Args:
+            group: group to cache.
+
+        Returns:
+            None. Updates self.
+        """
+        self.all_groups.append(group)
+        for safe_group in self.remove_excluded_groups([group]):
+            self.groups.append(safe_group)
+            self.index_group(safe_group)
+
     def reset_password(self, user: LdapUser, password: str):
         """
         Helper method to reset a user's password because this command is weird.
@@ -284,44 +490,36 @@ class LdapDirectory:
         """
         return self.conn.extend.microsoft.modify_password(user.distinguishedName, password)
 
-    def remove_users_from_excluded_ou(self, users: List[LdapUser]) -> List[LdapUser]:
+    def remove_excluded_users(self, users: List[LdapUser]) -> List[LdapUser]:
         """
-        Helper function for remove_excluded users. Should not be called directly.
+        Removes users from list if they are in self.excludedUsers or self.excludedOrganizationalUnits
 
         Args:
-            users: who to check for exclusions
+            users: Those you'll check for exclusions
 
         Returns:
             Safe list of users to sync.
         """
-        user_list: List[LdapUser] = []
-        for user in users:
-            exclude = False
-            for ou in self.excludedOrganizationalUnits:
-                if ou in user.parent_ou and user.parent_ou not in self.includedOrganizationalUnits:
-                    exclude = True
-            if not exclude:
-                user_list.append(user)
-        return user_list
+        return [user for user in users if self.is_sync_safe_user(user)]
 
-    def remove_excluded_users(self, users: List[LdapUser]) -> List[LdapUser]:
+    def is_sync_safe_user(self, user: LdapUser) -> bool:
         """
-        Removes users from list if they are in self.excludedUsers or self.excludedOrganizationalUnits
+        Checks a single user against self.excludedUsers and self.excludedOrganizationalUnits.
 
         Args:
-            users: Those you'll check for exclusions
+            user: user to check.
 
         Returns:
-            Safe list of users to sync.
+            True if the user is enabled and not excluded.
         """
-        user_list: List[LdapUser] = []
-        for user in users:
-            if (user.cn not in self.excludedUsers
-                    and user.sAMAccountName not in self.excludedUsers
-                    and user.userAccountControl != 514):  # uac 514 means user is disabled
-                user_list.append(user)
-        user_list = self.remove_users_from_excluded_ou(user_list)
-        return user_list
+        if (user.cn in self._excluded_users_set
+                or user.sAMAccountName in self._excluded_users_set
+                or user.userAccountControl == 514):  # uac 514 means user is disabled
+            return False
+        excluded_ou_re = self._excluded_ou_re
+        return (excluded_ou_re is None
+                or user.parent_ou in self._included_ous_set
+                or not excluded_ou_re.search(user.parent_ou))
 
     def get_all_groups(self, ou: str = None, recurse: bool = True) -> List[LdapGroup]:
         """
@@ -334,10 +532,22 @@ class LdapDirectory:
         Returns:
             ALL groups within that OU.
         """
+        return list(self.iter_all_groups(ou, recurse))
+
+    def iter_all_groups(self, ou: str = None, recurse: bool = True) -> Iterator[LdapGroup]:
+        """
+        Method to stream ALL groups as the search returns them. Does not process exclusions.
+
+        Args:
+            ou: OU to limit this search to. If none, uses self.base_dn
+            recurse: Should this include results from child OUs?
+
+        Yields:
+            Every group within that OU.
+        """
         print("Loading all LDAP Groups. This may take awhile.")
         if not ou:
             ou = self.base_dn
-        group_objects = []
         if recurse:
             search_scope = SUBTREE
         else:
@@ -345,14 +555,12 @@ class LdapDirectory:
         entry_generator = self.conn.extend.standard.paged_search(search_base=ou,
                                                                  search_filter='(objectclass=group)',
                                                                  search_scope=search_scope,
-                                                                 attributes=['*'],
-                                                                 paged_size=1000,
+                                                                 attributes=list(LdapGroup.LDAP_ATTRS),
+                                                                 paged_size=LdapDirectory.page_size,
+                                                                 paged_criticality=True,
                                                                  generator=True)
         for group in entry_generator:
-            group_objects.append(LdapGroup(group))
-        if len(group_objects) > 0:
-            return group_objects
-        return group_objects
+            yield LdapGroup(group)
 
     def remove_groups_from_excluded_ou(self, groups: List[LdapGroup]) -> List[LdapGroup]:
         """
@@ -364,15 +572,10 @@ class LdapDirectory:
         Returns:
             Sync-safe list of groups.
         """
-        group_list: List[LdapGroup] = []
-        for group in groups:
-            exclude = False
-            for ou in self.excludedOrganizationalUnits:
-                if ou in group.parent_ou and ou not in self.includedOrganizationalUnits:
-                    exclude = True
-            if not exclude:
-                group_list.append(group)
-        return group_list
+        excluded_ou_re = self._excluded_group_ou_re
+        if excluded_ou_re is None:
+            return list(groups)
+        return [group for group in groups if not excluded_ou_re.search(group.parent_ou)]
 
     def remove_excluded_groups(self, groups: List[LdapGroup]) -> List[LdapGroup]:
         """
@@ -384,11 +587,10 @@ class LdapDirectory:
         Returns:
             Sync-safe list of groups.
         """
-        group_list: List[LdapGroup] = []
-        for group in groups:
-            if (group.cn not in self.excludedGroups
-                    and group.sAMAccountName not in self.excludedGroups):
-                group_list.append(group)
+        excluded_groups = self._excluded_groups_set
+        group_list: List[LdapGroup] = [group for group in groups
+                                       if group.cn not in excluded_groups
+                                       and group.sAMAccountName not in excluded_groups]
         group_list = self.remove_groups_from_excluded_ou(group_list)
         return group_list
 
@@ -399,21 +601,14 @@ class LdapDirectory:
             sam: sAMAccountName of group you want to retrieve.
 
         Returns:
-            Single group.
+            Single group. If this directory is loaded, a cached group is returned without searching.
         """
-        group_objects = []
-        entry_generator = self.conn.extend.standard.paged_search(search_base=self.base_dn,
-                                                                 search_filter=f'(&(objectclass=group)(sAMAccountName={sam}))',
-                                                                 attributes=['*'],
-                                                                 paged_size=1000,
-                                                                 generator=True)
-        for group in entry_generator:
-            group_objects.append(LdapGroup(group))
-        if len(group_objects) == 1:
-            return group_objects[0]
-        else:
-            # todo replace with group not found error
-            return None
+        if not self.lazyLoaded:
+            group = self._groups_by_sam.get(sam)
+            if group is not None:
+                return group
+        # todo replace with group not found error
+        return self.search_single(LdapGroup, LdapDirectory._GROUP_BY_SAM.format(escape_filter_chars(sam)))
 
     def get_group_by_dn(self, dn: str) -> LdapGroup | None:
         """
@@ -423,35 +618,25 @@ class LdapDirectory:
             dn: distinguishedName of group. Must be exactly correct or returns none.
 
         Returns:
-            Single Group.
+            Single Group. If this directory is loaded, a cached group is returned without searching.
         """
-        group_objects = []
-        entry_generator = self.conn.extend.standard.paged_search(search_base=dn,
-                                                                 search_filter='(objectclass=group)',
-                                                                 attributes=['*'],
-                                                                 paged_size=1,
-                                                                 generator=True)
-        for group in entry_generator:
-            group_objects.append(LdapGroup(group))
-        if len(group_objects) > 1:
-            print("More than one result obtained.")
-            return None
-        if len(group_objects) == 1:
-            return group_objects[0]
-        else:
-            return None
+        if not self.lazyLoaded:
+            group = self._groups_by_dn.get(dn)
+            if group is not None:
+                return group
+        return self.search_single(LdapGroup, '(objectclass=group)', search_base=dn, search_scope=BASE)
 
     def get_cached_group_by_dn(self, dn: str) -> LdapGroup:
-        for group in self.groups:
-            if group.distinguishedName == dn:
-                return group
-        raise ValueError(dn)
+        group = self._groups_by_dn.get(dn)
+        if group is None:
+            raise ValueError(dn)
+        return group
 
     def get_cached_group_by_sam(self, sam: str) -> LdapGroup:
-        for group in self.groups:
-            if group.sAMAccountName == sam:
-                return group
-        raise ValueError(sam)
+        group = self._groups_by_sam.get(sam)
+        if group is None:
+            raise ValueError(sam)
+        return group
 
     def get_all_values_of_attribute(self, attribute: str) -> List:
         """
@@ -463,11 +648,16 @@ class LdapDirectory:
         Returns:
             All possible values of that attribute within the directory.
         """
-        values = []
-        for user in self.all_users:
-            if user.__getattribute__(attribute) not in values:
-                values.append(user.__getattribute__(attribute))
-        return values
+        all_values = [getattr(user, attribute) for user in self.all_users]
+        try:
+            return list(dict.fromkeys(all_values))
+        except TypeError:
+            # Multi-valued attributes such as memberOf are lists, which can't be hashed.
+            values = []
+            for value in all_values:
+                if value not in values:
+                    values.append(value)
+            return values
 
     def objectify_members(self, member_dns: List[str]) -> List[Union[LdapGroup, LdapUser]]:
         """
@@ -489,24 +679,34 @@ class LdapDirectory:
         return member_objects
 
     def get_nested_member_users(self, members: List[Union[LdapGroup, LdapUser]], name) -> List[LdapUser]:
+        """
+        Expands any groups in a member list into the users they contain, following nested groups one level at a time.
+        Each group is only expanded once, so groups that contain each other can't loop forever.
+
+        Args:
+            members: LdapUsers and LdapGroups, as returned by objectify_members.
+            name: Name of the group being expanded, for progress messages.
+
+        Returns:
+            The users in members plus every user found in its groups and their nested groups.
+        """
         # TODO: Replace this with the method from ldap3 using the magic AD method
-        while True:
-            group_in_members = False
-            print(f'Starting nested member loop for {name}.')
-            for member in members:
-                if type(member) == LdapGroup:
-                    group_in_members = True
-            if not group_in_members:
-                return members
-            for member in members:
-                if type(member) == LdapGroup:
-                    if member.members:
-                        nested_members = self.objectify_members(member.members)
-                        members.remove(member)
-                        for nested_member in nested_members:
-                            members.append(nested_member)
-                    else:
-                        members.remove(member)
+        print(f'Starting nested member loop for {name}.')
+        users: List[LdapUser] = []
+        seen_groups = set()
+        frontier = members
+        while frontier:
+            next_frontier = []
+            for member in frontier:
+                if type(member) is LdapGroup:
+                    if member.distinguishedName not in seen_groups:
+                        seen_groups.add(member.distinguishedName)
+                        if member.members:
+                            next_frontier.extend(self.objectify_members(member.members))
+                else:
+                    users.append(member)
+            frontier = next_frontier
+        return users
 
 
 class LdapUser:
@@ -520,6 +720,31 @@ class LdapUser:
         refactor naming convention to googleStyle
         methods - add/remove members, add to group, remove from group, alter fields
     """
+    #: (attribute, ldap attribute) pairs filled by fill_attrs_from_dict. Only a few differ in name or case.
+    _ATTR_MAP = (('accountExpires', 'accountExpires'), ('badPasswordTime', 'badPasswordTime'),
+                 ('badPwdCount', 'badPwdCount'), ('cn', 'cn'), ('codePage', 'codePage'), ('company', 'company'),
+                 ('countryCode', 'countryCode'), ('dSCorePropagationData', 'dSCorePropagationData'),
+                 ('department', 'department'), ('description', 'description'), ('displayName', 'displayName'),
+                 ('distinguishedName', 'distinguishedName'), ('employeeId', 'employeeID'),
+                 ('givenName', 'givenName'), ('instanceType', 'instanceType'), ('lastLogoff', 'lastLogoff'),
+                 ('lastLogon', 'lastLogon'), ('logon_count', 'logonCount'), ('mail', 'mail'),
+                 ('memberOf', 'memberOf'), ('name', 'name'), ('objectCategory', 'objectCategory'),
+                 ('objectClass', 'objectClass'), ('objectGUID', 'objectGUID'), ('objectSid', 'objectSid'),
+                 ('physicalDeliveryOfficeName', 'physicalDeliveryOfficeName'), ('primaryGroupId', 'primaryGroupID'),
+                 ('pwdLastSet', 'pwdLastSet'), ('sAMAccountName', 'sAMAccountName'),
+                 ('sAMAccountType', 'sAMAccountType'), ('sn', 'sn'), ('title', 'title'),
+                 ('uSNChanged', 'uSNChanged'), ('uSNCreated', 'uSNCreated'),
+                 ('userAccountControl', 'userAccountControl'), ('userPrincipalName', 'userPrincipalName'),
+                 ('whenChanged', 'whenChanged'), ('whenCreated', 'whenCreated'), ('userPassword', 'userPassword'))
+    #: Attributes requested when searching for users. userPassword is left out since AD never returns it.
+    LDAP_ATTRS = tuple(ldap_attr for _, ldap_attr in _ATTR_MAP if ldap_attr != 'userPassword')
+    _FIELDS = tuple(attr for attr, _ in _ATTR_MAP)  #: The user's directory attributes, as used by get_safe_dict.
+    # Slots instead of a per-instance __dict__, since a directory load keeps every user in memory.
+    __slots__ = ('dict', *_FIELDS, 'parent_ou')
+    # TODO: move _SAFE_TO_CHANGE to a configuration file
+    #: Attributes modify() is allowed to push to the directory.
+    _SAFE_TO_CHANGE = ('givenName', 'sn', 'userAccountControl', 'company', 'title', 'department', 'description')
+    _get_safe_to_change = attrgetter(*_SAFE_TO_CHANGE)  #: Reads every _SAFE_TO_CHANGE attribute as one tuple.
 
     def __init__(self, ldap_dict):
         try:
@@ -566,70 +791,44 @@ class LdapUser:
         self.whenCreated = None  #:
         self.userPassword = None  #:
         self.fill_attrs_from_dict()
-        try:
+        first_rdn = _FIRST_RDN_RE.match(self.distinguishedName) if self.distinguishedName else None
+        if first_rdn:
             self.parent_ou = self.distinguishedName[
-                             (4 + len(self.cn)):]  #: removes "CN={cn}," from distinguishedName to get full OU
-            self.direct_parent_ou_name = re.findall(r'OU=(.+?),',
-                                                    self.parent_ou)  #: gets the content between OU and comma and returns a list of values
-        except TypeError:
+                             first_rdn.end():]  #: removes "CN={cn}," from distinguishedName to get full OU
+        else:
             self.parent_ou = None
-        self.safeDict = self.get_safe_dict()
+
+    @property
+    def direct_parent_ou_name(self) -> Union[List[str], None]:
+        """
+        The content between OU and comma of each OU in parent_ou. Only parsed when asked for, since loading and
+        filtering the directory never reads it.
+        """
+        if self.parent_ou is None:
+            return None
+        return _OU_RE.findall(self.parent_ou)
+
+    @property
+    def safeDict(self) -> Dict:
+        """
+        get_safe_dict() of this user as it is now. Built when asked for instead of for every user in the directory,
+        since only users being created in LDAP need it.
+        """
+        return self.get_safe_dict()
 
     def fill_attrs_from_dict(self):
         """
-        Helper method to fill attributes. Fills anything missing from self.dict with None.
+        Helper method to fill attributes from LdapUser._ATTR_MAP. Attributes missing from self.dict are set to None.
         Should never be called directly, and should only be used by __init__.
 
         Returns:
             None. Updates self.
         """
-        while True:
-            try:
-                self.accountExpires = self.dict['accountExpires']
-                self.badPasswordTime = self.dict['badPasswordTime']
-                self.badPwdCount = self.dict['badPwdCount']
-                self.cn = self.dict['cn']
-                self.codePage = self.dict['codePage']
-                self.company = self.dict['company']  #:
-                self.countryCode = self.dict['countryCode']
-                self.dSCorePropagationData = self.dict['dSCorePropagationData']
-                self.department = self.dict['department']
-                self.description = self.dict['description']
-                if type(self.description) == list:
-                    self.description = self.description[0]
-                self.displayName = self.dict['displayName']
-                self.distinguishedName = self.dict['distinguishedName']
-                self.employeeId = self.dict['employeeID']
-                self.givenName = self.dict['givenName']
-                self.instanceType = self.dict['instanceType']
-                self.lastLogoff = self.dict['lastLogoff']
-                self.lastLogon = self.dict['lastLogon']
-                self.logon_count = self.dict['logonCount']
-                self.mail = self.dict['mail']
-                self.memberOf = self.dict['memberOf']
-                self.name = self.dict['name']
-                self.objectCategory = self.dict['objectCategory']
-                self.objectClass = self.dict['objectClass']
-                self.objectGUID = self.dict['objectGUID']
-                self.objectSid = self.dict['objectSid']
-                self.physicalDeliveryOfficeName = self.dict['physicalDeliveryOfficeName']
-                self.primaryGroupId = self.dict['primaryGroupID']
-                self.pwdLastSet = self.dict['pwdLastSet']
-                self.sAMAccountName = self.dict['sAMAccountName']
-                self.sAMAccountType = self.dict['sAMAccountType']
-                self.sn = self.dict['sn']
-                self.title = self.dict['title']
-                self.uSNChanged = self.dict['uSNChanged']
-                self.uSNCreated = self.dict['uSNCreated']
-                self.userAccountControl = self.dict['userAccountControl']
-                self.userPrincipalName = self.dict['userPrincipalName']
-                self.whenChanged = self.dict['whenChanged']
-                self.whenCreated = self.dict['whenCreated']
-                self.userPassword = self.dict['userPassword']
-                break
-            except KeyError as missing_key:
-                self.dict[str_missing_key(missing_key)] = None
-                continue
+        ldap_dict = self.dict
+        for attr, ldap_attr in LdapUser._ATTR_MAP:
+            setattr(self, attr, ldap_dict.get(ldap_attr))
+        if isinstance(self.description, list):
+            self.description = self.description[0]
 
     def get_safe_dict(self) -> Dict:
         """
@@ -638,15 +837,7 @@ class LdapUser:
         Returns:
             Dict containing all keys that have a value.
         """
-        safe_dict = {}
-        for k, v in self.__dict__.items():
-            if v is not None and k != 'dict':
-                safe_dict[k] = v
-        if 'parent_ou' in safe_dict.keys():
-            safe_dict.pop('parent_ou')
-        if 'direct_parent_ou_name' in safe_dict.keys():
-            safe_dict.pop('direct_parent_ou_name')
-        return safe_dict
+        return {field: value for field in LdapUser._FIELDS if (value := getattr(self, field)) is not None}
 
     def modify(self) -> LdapUser:
         """
@@ -657,24 +848,25 @@ class LdapUser:
         Returns:
             The user after changes have been made. Freshly pulled from the directory.
         """
-        # TODO: move safe_to_change to a configuration file
-        safe_to_change = ['givenName', 'sn', 'userAccountControl', 'company', 'title', 'department', 'description']
-        d = LdapDirectory(lazy_load=True)
+        d = LdapDirectory.get_lazy_directory()
         ldap_user = d.get_user_by_sam(self.sAMAccountName)
-        for k, v in self.__dict__.items():
-            if ldap_user.__getattribute__(k) != v and k in safe_to_change:
-                if ldap_user.__getattribute__(k) is not None and v is not None:
-                    d.conn.modify(self.distinguishedName,
-                                  {k: [(MODIFY_REPLACE, [v])]})
-                if ldap_user.__getattribute__(k) is None and v is not None:
-                    d.conn.modify(self.distinguishedName,
-                                  {k: [(MODIFY_ADD, [v])]})
-                if ldap_user.__getattribute__(k) is not None and v is None:
-                    d.conn.modify(self.distinguishedName,
-                                  {k: [(MODIFY_DELETE, [v])]})
-            elif ldap_user.__getattribute__(k) != v and k not in safe_to_change:
-                # todo Raise unsafe attribute error
-                pass
+        # todo Raise unsafe attribute error for changes to attributes not in _SAFE_TO_CHANGE
+        get_safe = LdapUser._get_safe_to_change
+        changes = {}
+        for k, v, current in zip(LdapUser._SAFE_TO_CHANGE, get_safe(self), get_safe(ldap_user)):
+            if current == v:
+                continue
+            if current is not None and v is not None:
+                changes[k] = [(MODIFY_REPLACE, [v])]
+            elif v is not None:
+                changes[k] = [(MODIFY_ADD, [v])]
+            else:
+                changes[k] = [(MODIFY_DELETE, [])]  # An empty list removes every value of the attribute.
+        if not changes:
+            # Nothing to push, so the user just fetched is already current.
+            return ldap_user
+        # Every change goes in a single request, so the user is updated in one round-trip.
+        d.conn.modify(self.distinguishedName, changes)
         return d.get_user_by_sam(self.sAMAccountName)
 
 
@@ -689,6 +881,18 @@ class LdapGroup:
         refactor naming convention to googleStyle
         methods - Reset password? add to group, remove from group, enable/disable/ alter fields
     """
+    #: Attributes requested when searching for groups, i.e. the ones fill_from_dict reads.
+    LDAP_ATTRS = ('distinguishedName', 'description', 'cn', 'groupType', 'instanceType', 'member', 'info', 'memberOf',
+                  'name', 'mail', 'objectCategory', 'objectClass', 'objectGUID', 'objectSid', 'sAMAccountName',
+                  'sAMAccountType', 'uSNChanged', 'uSNCreated', 'whenChanged', 'whenCreated')
+    #: The group's directory attributes, as used by get_safe_dict.
+    _FIELDS = ('distinguishedName', 'description', 'cn', 'groupType', 'instanceType', 'info', 'members', 'memberOf',
+               'name', 'mail', 'objectCategory', 'objectClass', 'objectGUID', 'objectSid', 'sAMAccountName',
+               'sAMAccountType', 'uSNChanged', 'uSNCreated', 'whenChanged', 'whenCreated')
+    # Slots instead of a per-instance __dict__, since a directory load keeps every group in memory.
+    __slots__ = ('dict', *_FIELDS, 'parent_ou')
+    _SAFE_TO_CHANGE = ('groupType', 'description')  #: Attributes modify() is allowed to push to the directory.
+    _get_safe_to_change = attrgetter(*_SAFE_TO_CHANGE)  #: Reads every _SAFE_TO_CHANGE attribute as one tuple.
 
     def __init__(self, ldap_dict):
         try:
@@ -715,65 +919,76 @@ class LdapGroup:
         self.uSNCreated = None  #:
         self.whenChanged = None  #:
         self.whenCreated = None  #:
+        self.parent_ou = None  #: distinguishedName without the group's own CN.
         self.fill_from_dict()
-        try:
+        first_rdn = _FIRST_RDN_RE.match(self.distinguishedName) if self.distinguishedName else None
+        if first_rdn:
             self.parent_ou = self.distinguishedName[
-                             (4 + len(self.cn)):]  #: removes "CN={cn}," from distinguishedName to get full OU
-            self.direct_parent_ou_name = re.findall(r'OU=(.+?),',
-                                                    self.parent_ou)  #: gets the content between OU and comma and returns a list of values
-        except TypeError:
-            self.parent_ou = None
-        self.safeDict = self.get_safe_dict()
+                             first_rdn.end():]  #: removes "CN={cn}," from distinguishedName to get full OU
+
+    @property
+    def direct_parent_ou_name(self) -> Union[List[str], None]:
+        """
+        The content between OU and comma of each OU in parent_ou. Only parsed when asked for, since loading and
+        filtering the directory never reads it.
+        """
+        if self.parent_ou is None:
+            return None
+        return _OU_RE.findall(self.parent_ou)
+
+    @property
+    def safeDict(self) -> Dict:
+        """
+        get_safe_dict() of this group as it is now. Built when asked for instead of for every group in the directory,
+        since only groups being created in LDAP need it.
+        """
+        return self.get_safe_dict()
 
     def fill_from_dict(self):
         """
-        Helper method to fill attributes. Fills anything missing from self.dict with None.
+        Helper method to fill attributes. Anything missing from self.dict is set to None.
         Should never be called directly, and should only be used by __init__.
 
         Returns:
             None. Updates self.
         """
-        while True:
-            try:
-                self.distinguishedName = self.dict['distinguishedName']
-                self.description = self.dict['description']
-                if type(self.description) == list:
-                    self.description = self.description[0]
-                self.cn = self.dict['cn']
-                self.groupType = self.dict['groupType']
-                self.instanceType = self.dict['instanceType']
-                self.members = self.dict['member']  # todo make this ldap user or group objects
-                self.info = self.dict['info']
-                self.memberOf = self.dict['memberOf']  # todo make this ldap group objects
-                self.name = self.dict['name']
-                self.mail = self.dict['mail']
-                self.objectCategory = self.dict['objectCategory']
-                self.objectClass = self.dict['objectClass']
-                self.objectGUID = self.dict['objectGUID']
-                self.objectSid = self.dict['objectSid']
-                self.sAMAccountName = self.dict['sAMAccountName']
-                self.sAMAccountType = self.dict['sAMAccountType']
-                self.uSNChanged = self.dict['USNChanged']
-                self.uSNCreated = self.dict['uSNCreated']
-                self.whenChanged = self.dict['whenChanged']
-                self.whenCreated = self.dict['whenChanged']
-                break
-            except KeyError as missing_key:
-                self.dict[str_missing_key(missing_key)] = None
-                continue
+        ldap_dict = self.dict
+        self.distinguishedName = ldap_dict.get('distinguishedName')
+        self.description = ldap_dict.get('description')
+        if isinstance(self.description, list):
+            self.description = self.description[0]
+        self.cn = ldap_dict.get('cn')
+        self.groupType = ldap_dict.get('groupType')
+        self.instanceType = ldap_dict.get('instanceType')
+        self.members = ldap_dict.get('member')  # todo make this ldap user or group objects
+        self.info = ldap_dict.get('info')
+        self.memberOf = ldap_dict.get('memberOf')  # todo make this ldap group objects
+        self.name = ldap_dict.get('name')
+        self.mail = ldap_dict.get('mail')
+        self.objectCategory = ldap_dict.get('objectCategory')
+        self.objectClass = ldap_dict.get('objectClass')
+        self.objectGUID = ldap_dict.get('objectGUID')
+        self.objectSid = ldap_dict.get('objectSid')
+        self.sAMAccountName = ldap_dict.get('sAMAccountName')
+        self.sAMAccountType = ldap_dict.get('sAMAccountType')
+        self.uSNChanged = ldap_dict.get('USNChanged')
+        self.uSNCreated = ldap_dict.get('uSNCreated')
+        self.whenChanged = ldap_dict.get('whenChanged')
+        self.whenCreated = ldap_dict.get('whenCreated')
 
     def add_member(self, members: List[Union[LdapUser, LdapGroup]]) -> bool:
         """
         Adds a members to this group.
 
         Args:
-            members: A list of LdapUser objects. Must be a list, even if one user.
+            members: A list of LdapUser or LdapGroup objects, or their distinguished names. Must be a list, even if
+                one user.
 
         Returns:
             True if successful else false.
         """
-        d = LdapDirectory(lazy_load=True)
-        member_dns = [user.distinguishedName for user in members]
+        d = LdapDirectory.get_lazy_directory()
+        member_dns = LdapGroup.to_dns(members)
         result = d.conn.extend.microsoft.add_members_to_groups(members=member_dns,
                                                                groups=self.distinguishedName)
         return result
@@ -783,17 +998,31 @@ class LdapGroup:
         Removes a members from this group.
 
         Args:
-            members: A list of LdapUser objects. Must be a list, even if one user.
+            members: A list of LdapUser or LdapGroup objects, or their distinguished names. Must be a list, even if
+                one user.
 
         Returns:
             True if successful else false.
         """
-        d = LdapDirectory(lazy_load=True)
-        member_dns = [user.distinguishedName for user in members]
+        d = LdapDirectory.get_lazy_directory()
+        member_dns = LdapGroup.to_dns(members)
         result = d.conn.extend.microsoft.remove_members_from_groups(members=member_dns,
                                                                     groups=self.distinguishedName)
         return result
 
+    @staticmethod
+    def to_dns(members: List[Union[LdapUser, LdapGroup, str]]) -> List[str]:
+        """
+        Helper method to get the distinguished names of group members.
+
+        Args:
+            members: LdapUser or LdapGroup objects, or distinguished names, which are used as they are.
+
+        Returns:
+            A list of distinguished names.
+        """
+        return [member if isinstance(member, str) else member.distinguishedName for member in members]
+
     def get_safe_dict(self) -> Dict:
         """
         Helper method to generate a version of the user's attributes without attributes that are None.
@@ -801,15 +1030,7 @@ class LdapGroup:
         Returns:
             Dict containing all keys that have a value.
         """
-        safe_dict = {}
-        for k, v in self.__dict__.items():
-            if v is not None and k != 'dict':
-                safe_dict[k] = v
-        if 'parent_ou' in safe_dict.keys():
-            safe_dict.pop('parent_ou')
-        if 'direct_parent_ou_name' in safe_dict.keys():
-            safe_dict.pop('direct_parent_ou_name')
-        return safe_dict
+        return {field: value for field in LdapGroup._FIELDS if (value := getattr(self, field)) is not None}
 
     def modify(self) -> LdapGroup:
         """
@@ -820,23 +1041,24 @@ class LdapGroup:
         Returns:
             The group after changes have been made. Freshly pulled from the directory.
         """
-        safe_to_change = ['groupType', 'description']
-        d = LdapDirectory(lazy_load=True)
+        d = LdapDirectory.get_lazy_directory()
         ldap_group = d.get_group_by_sam(self.sAMAccountName)
-        for k, v in self.__dict__.items():
-            if ldap_group.__getattribute__(k) != v and k in safe_to_change:
-                if ldap_group.__getattribute__(k) is not None and v is not None:
-                    d.conn.modify(self.distinguishedName,
-                                  {k: [(MODIFY_REPLACE, [v])]})
-                if ldap_group.__getattribute__(k) is None and v is not None:
-                    d.conn.modify(self.distinguishedName,
-                                  {k: [(MODIFY_ADD, [v])]})
-                if ldap_group.__getattribute__(k) is not None and v is None:
-                    d.conn.modify(self.distinguishedName,
-                                  {k: [(MODIFY_DELETE, [v])]})
-            elif ldap_group.__getattribute__(k) != v and k not in safe_to_change:
-                # todo Raise unsafe attribute error
-                pass
+        # todo Raise unsafe attribute error for changes to attributes not in _SAFE_TO_CHANGE
+        get_safe = LdapGroup._get_safe_to_change
+        changes = {}
+        for k, v, current in zip(LdapGroup._SAFE_TO_CHANGE, get_safe(self), get_safe(ldap_group)):
+            if current == v:
+                continue
+            if current is not None and v is not None:
+                changes[k] = [(MODIFY_REPLACE, [v])]
+            elif v is not None:
+                changes[k] = [(MODIFY_ADD, [v])]
+            else:
+                changes[k] = [(MODIFY_DELETE, [])]  # An empty list removes every value of the attribute.
+        if not changes:
+            # Nothing to push, so the group just fetched is already current.
+            return ldap_group
+        d.conn.modify(self.distinguishedName, changes)
         return d.get_group_by_sam(self.sAMAccountName)
 
     # TODO: Methods (see google group to know what to add)
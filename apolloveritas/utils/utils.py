@@ -1,13 +1,10 @@
 import csv
-from typing import List, Dict
+from typing import List, Dict, Iterator
 
 
 def str_missing_key(error):
     """Return the name of a missing key from MissingKey exceptions."""
-    e = str(error)
-    e = e[1:]
-    e = e[:-1]
-    return e
+    return error.args[0]
 
 
 def is_valid_email(email: str) -> bool:
@@ -19,10 +16,7 @@ def is_valid_email(email: str) -> bool:
     Returns:
         bool: Is email valid?
     """
-    if type(email) is str and "@" in email:
-        return True
-    else:
-        return False
+    return isinstance(email, str) and "@" in email
 
 
 def csv_to_dict(filepath) -> List[Dict]:
@@ -34,9 +28,47 @@ def csv_to_dict(filepath) -> List[Dict]:
     Returns:
         list with a dict per row of csv
     """
-    out_list = []
     with open(filepath, 'r', newline='') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            out_list.append(row)
-    return out_list
+        return list(_csv_dict_rows(csvfile))
+
+
+def csv_to_dicts_iter(filepath) -> Iterator[Dict]:
+    """
+    Streams the rows of a csv as dicts, one at a time, without reading the whole file into memory.
+    Args:
+        filepath: string or pathlib path representing the absolute or relative filepath
+
+    Yields:
+        dict per row of csv
+    """
+    with open(filepath, 'r', newline='') as csvfile:
+        yield from _csv_dict_rows(csvfile)
+
+
+def _csv_dict_rows(csvfile) -> Iterator[Dict]:
+    """
+    Reads rows the same way csv.DictReader does, but pairs each row with the header directly instead of going
+    through DictReader's per-row bookkeeping, which is most of the cost of reading a large csv.
+    Args:
+        csvfile: open file object of a csv whose first row is the header
+
+    Yields:
+        dict per non-blank row of csv
+    """
+    reader = csv.reader(csvfile)
+    header = next(reader, None)
+    if header is None:
+        return
+    width = len(header)
+    for row in reader:
+        if len(row) == width:
+            yield dict(zip(header, row))
+        elif row:
+            # Ragged rows come out as DictReader makes them: extra values in a list under None, missing ones None.
+            values = dict(zip(header, row))
+            if len(row) > width:
+                values[None] = row[width:]
+            else:
+                for key in header[len(row):]:
+                    values[key] = None
+            yield values
@@ -0,0 +1,21 @@
+import unittest
+
+from apolloveritas.district.district import Student
+
+
+class TestStudentEnrolled(unittest.TestCase):
+    @staticmethod
+    def enrolled(value):
+        return Student.from_csv_row(('1', 'First', None, 'Last', '3', '10', value, None)).enrolled
+
+    def test_enrolled_values(self):
+        for value in ('true', 'True', '1', 'yes', 'Y', ' enrolled '):
+            self.assertTrue(self.enrolled(value), value)
+
+    def test_not_enrolled_values(self):
+        for value in ('false', '0', 'N', '', None):
+            self.assertFalse(self.enrolled(value), value)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from unittest.mock import MagicMock
+
+from apolloveritas.google.group import GoogleGroup
+
+
+class TestGoogleGroupAliases(unittest.TestCase):
+    def setUp(self):
+        self.payload = {
+            'kind': 'admin#directory#group',
+            'id': '0123abcd',
+            'etag': '"etag"',
+            'email': 'staff@example.org',
+            'name': 'Staff',
+            'directMembersCount': '2',
+            'description': 'All staff',
+            'adminCreated': True,
+        }
+
+    def test_missing_non_editable_aliases(self):
+        group = GoogleGroup(service=MagicMock(), settings_service=MagicMock(), group=self.payload)
+        self.assertEqual(group.nonEditableAliases, [])
+        self.assertEqual(group.jsonify()['nonEditableAliases'], [])
+
+    def test_non_editable_aliases_are_not_nested(self):
+        self.payload['nonEditableAliases'] = ['staff@example.org.test-google-a.com']
+        group = GoogleGroup(service=MagicMock(), settings_service=MagicMock(), group=self.payload)
+        self.assertEqual(group.jsonify()['nonEditableAliases'], ['staff@example.org.test-google-a.com'])
+
+
+class TestGoogleGroupSettingsDiff(unittest.TestCase):
+    def setUp(self):
+        payload = {'kind': 'admin#directory#group', 'id': '0123abcd', 'etag': '"etag"', 'email': 'staff@example.org',
+                   'name': 'Staff'}
+        self.group = GoogleGroup(service=MagicMock(), settings_service=MagicMock(), group=payload)
+        # The Groups Settings API returns every value as a string.
+        self.group.settings = {k: str(v).lower() if isinstance(v, bool) else v
+                               for k, v in GoogleGroup.security_group_settings.items()}
+
+    def test_matching_settings_are_a_no_op(self):
+        diff = self.group.settings_diff(GoogleGroup.security_group_settings,
+                                        GoogleGroup._normalized_security_group_settings)
+        self.assertEqual(diff, {})
+        self.assertFalse(self.group.patch_settings(diff))
+        self.group.settings_service.groups().patch.assert_not_called()
+
+    def test_changed_setting_is_in_diff(self):
+        self.group.settings['whoCanJoin'] = 'ALL_IN_DOMAIN_CAN_JOIN'
+        diff = self.group.settings_diff(GoogleGroup.security_group_settings,
+                                        GoogleGroup._normalized_security_group_settings)
+        self.assertEqual(diff, {'whoCanJoin': 'INVITED_CAN_JOIN'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import MagicMock
+
+from apolloveritas.ldap import LdapDirectory, LdapUser, LdapGroup
+
+
+def make_directory(users=(), groups=()):
+    """Builds a loaded LdapDirectory around the given entries without connecting to a server."""
+    directory = LdapDirectory.__new__(LdapDirectory)
+    directory.lazyLoaded = False
+    directory.base_dn = 'DC=example,DC=org'
+    directory.conn = MagicMock()
+    directory.conn.response = []
+    directory.all_users = list(users)
+    directory.groups = list(groups)
+    directory.index_users()
+    directory.index_groups()
+    return directory
+
+
+class TestParentOu(unittest.TestCase):
+    dn = 'CN=Doe\\, John,OU=Staff,OU=High School,DC=example,DC=org'
+
+    def test_user_with_escaped_comma(self):
+        user = LdapUser({'attributes': {'distinguishedName': self.dn, 'cn': 'Doe, John'}})
+        self.assertEqual(user.parent_ou, 'OU=Staff,OU=High School,DC=example,DC=org')
+        self.assertEqual(user.direct_parent_ou_name, ['Staff', 'High School'])
+
+    def test_group_with_escaped_comma(self):
+        group = LdapGroup({'attributes': {'distinguishedName': self.dn, 'cn': 'Doe, John'}})
+        self.assertEqual(group.parent_ou, 'OU=Staff,OU=High School,DC=example,DC=org')
+        self.assertEqual(group.direct_parent_ou_name, ['Staff', 'High School'])
+
+    def test_missing_dn(self):
+        group = LdapGroup({'attributes': {}})
+        self.assertIsNone(group.parent_ou)
+        self.assertIsNone(group.direct_parent_ou_name)
+
+
+class TestNestedMembers(unittest.TestCase):
+    def test_groups_that_contain_each_other(self):
+        user_a = LdapUser({'attributes': {'distinguishedName': 'CN=a,OU=Staff,DC=example,DC=org',
+                                           'sAMAccountName': 'a'}})
+        user_b = LdapUser({'attributes': {'distinguishedName': 'CN=b,OU=Staff,DC=example,DC=org',
+                                           'sAMAccountName': 'b'}})
+        group_1 = LdapGroup({'attributes': {'distinguishedName': 'CN=g1,OU=Groups,DC=example,DC=org',
+                                            'member': ['CN=a,OU=Staff,DC=example,DC=org',
+                                                       'CN=g2,OU=Groups,DC=example,DC=org']}})
+        group_2 = LdapGroup({'attributes': {'distinguishedName': 'CN=g2,OU=Groups,DC=example,DC=org',
+                                            'member': ['CN=b,OU=Staff,DC=example,DC=org',
+                                                       'CN=g1,OU=Groups,DC=example,DC=org']}})
+        directory = make_directory([user_a, user_b], [group_1, group_2])
+        users = directory.get_nested_member_users([group_1], 'g1')
+        self.assertEqual(users, [user_a, user_b])
+
+
+class TestFilterEscaping(unittest.TestCase):
+    def test_lookup_values_are_escaped(self):
+        directory = make_directory()
+        directory.lazyLoaded = True
+        self.assertIsNone(directory.get_user_by_sam('a*)(sAMAccountName=*'))
+        search_filter = directory.conn.search.call_args.kwargs['search_filter']
+        self.assertEqual(search_filter, '(&(objectclass=user)(sAMAccountName=a\\2a\\29\\28sAMAccountName=\\2a))')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+
+from apolloveritas.utils.utils import csv_to_dict, csv_to_dicts_iter
+
+
+class TestCsvToDict(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def assert_matches_dict_reader(self, text):
+        path = Path(self.tmp.name, 'rows.csv')
+        path.write_text(text, newline='')
+        with open(path, 'r', newline='') as csvfile:
+            expected = list(csv.DictReader(csvfile))
+        self.assertEqual(csv_to_dict(path), expected)
+        self.assertEqual(list(csv_to_dicts_iter(path)), expected)
+
+    def test_regular_rows(self):
+        self.assert_matches_dict_reader('a,b,c\n1,2,3\n4,5,6\n')
+
+    def test_blank_short_and_long_rows(self):
+        self.assert_matches_dict_reader('a,b,c\n1,2,3\n\n4\n5,6,7,8\n')
+
+    def test_quoted_values(self):
+        self.assert_matches_dict_reader('a,b\n"x, y","line\nbreak"\n')
+
+    def test_empty_file(self):
+        self.assert_matches_dict_reader('')
+
+
+if __name__ == '__main__':
+    unittest.main()